@@ -5,7 +5,10 @@ Catalogs are zero-byte placeholder files that mirror the tape structure,
 preserving timestamps. This allows browsing tape contents without mounting.
 """
 
+import fnmatch
+import json
 import os
+import re
 import shutil
 from dataclasses import dataclass
 from datetime import datetime
@@ -16,6 +19,9 @@ from .config import Config, get_config
 from .ltfs_index import LTFSIndexParser, LTFSIndex, IndexFile, IndexDirectory
 from .utils import normalize_path
 
+# Bump when the search cache layout changes
+SEARCH_CACHE_VERSION = 1
+
 
 @dataclass
 class CatalogEntry:
@@ -162,6 +168,94 @@ def list_tapes(config: Optional[Config] = None) -> list[str]:
     return sorted(tapes)
 
 
+def _scan_catalog(catalog_dir: Path) -> tuple[dict[str, int], list[str]]:
+    """
+    Walk a catalog directory.
+
+    Returns:
+        (dir_mtimes, files): mtime_ns of every directory keyed by relative
+        path ("" for the root), and NFC-normalized relative file paths
+    """
+    base = os.fspath(catalog_dir)
+    prefix_len = len(os.path.join(base, ""))
+    dir_mtimes: dict[str, int] = {}
+    files: list[str] = []
+
+    stack = [base]
+    while stack:
+        dirpath = stack.pop()
+        rel_dir = dirpath[prefix_len:]
+        try:
+            # Stat before listing, so a file added mid-scan invalidates the cache
+            dir_mtimes[rel_dir] = os.stat(dirpath).st_mtime_ns
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        files.append(normalize_path(os.path.join(rel_dir, entry.name)))
+        except OSError:
+            continue
+
+    files.sort()
+    return dir_mtimes, files
+
+
+def _catalog_files(tape_name: str, config: Config) -> list[str]:
+    """
+    List a catalog's relative file paths, using an on-disk cache.
+
+    The cache records each directory's mtime. Adding or removing an entry
+    changes its directory's mtime, so validating the cache only needs one
+    stat per directory instead of listing every directory and checking
+    every file.
+    """
+    catalog_dir = config.catalog_dir / tape_name
+    cache_path = config.archive_base / "cache" / "catalog-search" / f"{tape_name}.json"
+    base = os.fspath(catalog_dir)
+
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached.get("version") == SEARCH_CACHE_VERSION and all(
+            os.stat(os.path.join(base, rel_dir)).st_mtime_ns == mtime
+            for rel_dir, mtime in cached["dirs"].items()
+        ):
+            return cached["files"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    dir_mtimes, files = _scan_catalog(catalog_dir)
+    if "" not in dir_mtimes:
+        # Catalog directory missing or unreadable; nothing worth caching
+        return files
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": SEARCH_CACHE_VERSION, "dirs": dir_mtimes, "files": files}),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return files
+
+
+def _compile_pattern(pattern: str):
+    """
+    Compile a glob pattern into a match function, once per search.
+
+    "prefix*" patterns become a plain startswith check; anything else is
+    translated to a regex (fnmatch.fnmatch would re-translate per call).
+    """
+    prefix = pattern[:-1]
+    if pattern.endswith("*") and not any(c in prefix for c in "*?["):
+        return lambda path: path.startswith(prefix)
+    return re.compile(fnmatch.translate(pattern)).match
+
+
 def search_catalogs(
     pattern: str,
     tape_name: Optional[str] = None,
@@ -187,21 +281,14 @@ def search_catalogs(
     else:
         tapes = list_tapes(config)
 
-    # Convert simple wildcard to glob pattern
-    import fnmatch
-
     # Normalize pattern for cross-platform consistency
-    pattern = normalize_path(pattern)
+    pattern = normalize_path(pattern).lower()
+    match = _compile_pattern(pattern)
 
     for tape in tapes:
-        catalog_dir = config.catalog_dir / tape
-
-        for path in catalog_dir.rglob("*"):
-            if path.is_file():
-                # Normalize path for cross-platform consistency
-                rel_path = normalize_path(str(path.relative_to(catalog_dir)))
-                if fnmatch.fnmatch(rel_path.lower(), pattern.lower()):
-                    results.append((tape, rel_path))
+        for rel_path in _catalog_files(tape, config):
+            if match(rel_path.lower()):
+                results.append((tape, rel_path))
 
     return results
 
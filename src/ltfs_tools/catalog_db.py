@@ -5,7 +5,9 @@ Provides faster search capabilities than the zero-byte file catalogs,
 with support for hash-based duplicate detection and rich queries.
 """
 
+import re
 import sqlite3
+import threading
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -17,7 +19,36 @@ from .utils import normalize_path
 
 
 # Schema version for migrations
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 4
+
+# Rows per executemany() call when inserting files
+INSERT_BATCH_SIZE = 1000
+
+# Per-connection settings. WAL plus synchronous=NORMAL means commits no
+# longer fsync the main database file.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+# Per-thread CatalogDB instances handed out by CatalogDB.reopen()
+_shared = threading.local()
+
+# Splits a LIKE pattern into its literal runs
+_LIKE_WILDCARDS = re.compile(r"[%_]")
+
+_UPSERT_FILE_SQL = """
+    INSERT INTO files (tape_name, path, size, mtime, xxhash, archived_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(tape_name, path) DO UPDATE SET
+        size = excluded.size,
+        mtime = excluded.mtime,
+        xxhash = excluded.xxhash,
+        archived_at = excluded.archived_at
+"""
 
 
 @dataclass
@@ -53,6 +84,24 @@ class SearchResult:
     xxhash: Optional[str] = None
 
 
+def _result_from_row(row: sqlite3.Row) -> SearchResult:
+    """Build a SearchResult from a files row."""
+    mtime = None
+    if row["mtime"]:
+        try:
+            mtime = datetime.fromisoformat(row["mtime"])
+        except ValueError:
+            pass
+
+    return SearchResult(
+        tape_name=row["tape_name"],
+        path=row["path"],
+        size=row["size"],
+        mtime=mtime,
+        xxhash=row["xxhash"],
+    )
+
+
 @dataclass
 class TapeStats:
     """Statistics for a tape."""
@@ -75,31 +124,136 @@ class CatalogDB:
                     If None, uses config.archive_base / "catalog.db"
             config: Configuration object
         """
-        if config is None:
-            config = get_config()
+        self.db_path = self._resolve_path(db_path, config)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        if db_path is None:
-            db_path = config.archive_base / "catalog.db"
+        # One connection per thread, opened on first use and kept for the
+        # lifetime of this object so SQLite's statement cache is reused
+        self._local = threading.local()
 
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Whether the trigram index exists (set by _init_db)
+        self._has_trigram = False
 
         # Initialize database on first access
         self._init_db()
 
+    @staticmethod
+    def _resolve_path(db_path: Optional[Path], config: Optional[Config]) -> Path:
+        """Return db_path, or the default catalog.db under the archive base."""
+        if db_path is None:
+            if config is None:
+                config = get_config()
+            db_path = config.archive_base / "catalog.db"
+        return Path(db_path)
+
+    @classmethod
+    def reopen(cls, db_path: Optional[Path] = None, config: Optional[Config] = None) -> "CatalogDB":
+        """
+        Get a shared CatalogDB for a database file.
+
+        Returns the same instance (and so the same open connection) each time
+        it is called for a given path from the same thread, skipping the
+        connection setup and schema check after the first call.
+
+        Args:
+            db_path: Path to the SQLite database file
+            config: Configuration object
+
+        Returns:
+            CatalogDB instance
+        """
+        path = cls._resolve_path(db_path, config)
+        instances = getattr(_shared, "instances", None)
+        if instances is None:
+            instances = _shared.instances = {}
+
+        db = instances.get(path)
+        if db is None:
+            db = instances[path] = cls(path, config)
+        return db
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are started explicitly by
+            # _connection() and bulk_transaction()
+            conn = sqlite3.connect(
+                self.db_path,
+                isolation_level=None,
+                cached_statements=256,
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection (it is reopened on next use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
     @contextmanager
     def _connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Context manager for a transaction on this thread's connection.
+
+        If a transaction is already open (e.g. inside bulk_transaction())
+        this runs under a savepoint instead, so a failed operation is undone
+        without ending the outer transaction; commit is left to the outer block.
+        """
+        conn = self._conn()
+        if conn.in_transaction:
+            conn.execute("SAVEPOINT catalog_op")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK TO catalog_op")
+                    conn.execute("RELEASE catalog_op")
+                raise
+            conn.execute("RELEASE catalog_op")
+            return
+
+        conn.execute("BEGIN")
         try:
             yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def bulk_transaction(self):
+        """
+        Run several operations in a single transaction.
+
+        All CatalogDB calls made inside the block are committed together at
+        the end (or rolled back on error), instead of paying a commit per
+        call.
+
+        Example:
+            with db.bulk_transaction():
+                for mhl_path in mhl_files:
+                    db.import_from_mhl(mhl_path)
+        """
+        conn = self._conn()
+        if conn.in_transaction:
+            # Nested: join the outer transaction
+            yield
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
             raise
-        finally:
-            conn.close()
 
     def _init_db(self):
         """Initialize the database schema."""
@@ -121,6 +275,11 @@ class CatalogDB:
             if current_version < SCHEMA_VERSION:
                 self._migrate(conn, current_version)
 
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'files_trigram'"
+            )
+            self._has_trigram = cursor.fetchone() is not None
+
     def _migrate(self, conn: sqlite3.Connection, from_version: int):
         """Run database migrations."""
         cursor = conn.cursor()
@@ -193,6 +352,63 @@ class CatalogDB:
                 END
             """)
 
+        if from_version < 2:
+            # Trigram index so wildcard searches (LIKE '%foo%') use index
+            # lookups instead of scanning every path. Requires SQLite 3.34+;
+            # without it search() keeps using LIKE on the files table.
+            try:
+                cursor.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS files_trigram
+                    USING fts5(path, content='files', content_rowid='id', tokenize='trigram')
+                """)
+            except sqlite3.OperationalError:
+                pass
+            else:
+                cursor.execute("""
+                    CREATE TRIGGER IF NOT EXISTS files_trigram_ai AFTER INSERT ON files BEGIN
+                        INSERT INTO files_trigram(rowid, path) VALUES (new.id, new.path);
+                    END
+                """)
+
+                cursor.execute("""
+                    CREATE TRIGGER IF NOT EXISTS files_trigram_ad AFTER DELETE ON files BEGIN
+                        INSERT INTO files_trigram(files_trigram, rowid, path)
+                        VALUES('delete', old.id, old.path);
+                    END
+                """)
+
+                cursor.execute("""
+                    CREATE TRIGGER IF NOT EXISTS files_trigram_au AFTER UPDATE ON files BEGIN
+                        INSERT INTO files_trigram(files_trigram, rowid, path)
+                        VALUES('delete', old.id, old.path);
+                        INSERT INTO files_trigram(rowid, path) VALUES (new.id, new.path);
+                    END
+                """)
+
+                # Index rows that existed before this migration
+                cursor.execute("INSERT INTO files_trigram(files_trigram) VALUES('rebuild')")
+
+        if from_version < 3:
+            # Lets duplicate detection group by hash and filter by size
+            # from the index alone
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_files_hash_size
+                ON files(xxhash, size)
+            """)
+
+        if from_version < 4:
+            # Covering index for hash lookups: find_by_hash(es) and duplicate
+            # detection read every column they need from the index, already
+            # in (tape_name, path) order, without touching the table. It
+            # supersedes the narrower hash indexes.
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_files_hash_covering
+                ON files(xxhash, tape_name, path, size, mtime)
+            """)
+            cursor.execute("DROP INDEX IF EXISTS idx_files_xxhash")
+            cursor.execute("DROP INDEX IF EXISTS idx_files_hash_size")
+            cursor.execute("ANALYZE")
+
         # Update schema version
         cursor.execute("DELETE FROM schema_version")
         cursor.execute("INSERT INTO schema_version (version) VALUES (?)", (SCHEMA_VERSION,))
@@ -214,18 +430,65 @@ class CatalogDB:
             created_at: When the tape was created/formatted
         """
         with self._connection() as conn:
-            cursor = conn.cursor()
+            self._upsert_tape(conn.cursor(), name, volume_uuid, barcode, created_at)
+
+    @staticmethod
+    def _upsert_tape(
+        cursor: sqlite3.Cursor,
+        name: str,
+        volume_uuid: Optional[str] = None,
+        barcode: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+    ) -> None:
+        """Insert or update a tape row using an existing cursor."""
+        created_str = created_at.isoformat() if created_at else None
+
+        cursor.execute("""
+            INSERT INTO tapes (name, volume_uuid, barcode, created_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                volume_uuid = COALESCE(excluded.volume_uuid, tapes.volume_uuid),
+                barcode = COALESCE(excluded.barcode, tapes.barcode),
+                created_at = COALESCE(excluded.created_at, tapes.created_at)
+        """, (name, volume_uuid, barcode, created_str))
+
+    @staticmethod
+    def _upsert_files(cursor: sqlite3.Cursor, rows: list[tuple]) -> int:
+        """
+        Insert or update file rows using an existing cursor.
 
-            created_str = created_at.isoformat() if created_at else None
+        Args:
+            cursor: Cursor to execute on
+            rows: (tape_name, path, size, mtime, xxhash, archived_at) tuples
 
-            cursor.execute("""
-                INSERT INTO tapes (name, volume_uuid, barcode, created_at)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(name) DO UPDATE SET
-                    volume_uuid = COALESCE(excluded.volume_uuid, tapes.volume_uuid),
-                    barcode = COALESCE(excluded.barcode, tapes.barcode),
-                    created_at = COALESCE(excluded.created_at, tapes.created_at)
-            """, (name, volume_uuid, barcode, created_str))
+        Returns:
+            Number of rows written
+        """
+        added = 0
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch = rows[start:start + INSERT_BATCH_SIZE]
+            try:
+                cursor.executemany(_UPSERT_FILE_SQL, batch)
+                added += len(batch)
+            except sqlite3.Error:
+                # Retry row by row so one bad record doesn't drop the batch
+                for row in batch:
+                    try:
+                        cursor.execute(_UPSERT_FILE_SQL, row)
+                        added += 1
+                    except sqlite3.Error:
+                        continue
+        return added
+
+    @staticmethod
+    def _update_tape_stats(cursor: sqlite3.Cursor, tape_name: str) -> None:
+        """Recompute a tape's file_count and total_bytes."""
+        cursor.execute("""
+            UPDATE tapes SET
+                file_count = (SELECT COUNT(*) FROM files WHERE tape_name = ?),
+                total_bytes = (SELECT COALESCE(SUM(size), 0) FROM files WHERE tape_name = ?)
+            WHERE name = ?
+        """, (tape_name, tape_name, tape_name))
 
     def add_files(
         self,
@@ -262,105 +525,161 @@ class CatalogDB:
             )
 
             # Insert files
-            added = 0
-            total_bytes = 0
+            rows = []
 
             for path, size, mtime, xxhash in files:
                 mtime_str = mtime.isoformat() if mtime else None
                 # Normalize path to NFC for cross-platform consistency
                 normalized_path = normalize_path(path)
+                rows.append((tape_name, normalized_path, size, mtime_str, xxhash, archived_str))
 
-                try:
-                    cursor.execute("""
-                        INSERT INTO files (tape_name, path, size, mtime, xxhash, archived_at)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(tape_name, path) DO UPDATE SET
-                            size = excluded.size,
-                            mtime = excluded.mtime,
-                            xxhash = excluded.xxhash,
-                            archived_at = excluded.archived_at
-                    """, (tape_name, normalized_path, size, mtime_str, xxhash, archived_str))
-                    added += 1
-                    total_bytes += size
-                except sqlite3.Error:
-                    continue
+            added = self._upsert_files(cursor, rows)
 
             # Update tape stats
-            cursor.execute("""
-                UPDATE tapes SET
-                    file_count = (SELECT COUNT(*) FROM files WHERE tape_name = ?),
-                    total_bytes = (SELECT COALESCE(SUM(size), 0) FROM files WHERE tape_name = ?)
-                WHERE name = ?
-            """, (tape_name, tape_name, tape_name))
+            self._update_tape_stats(cursor, tape_name)
 
             return added
 
+    def _search_clause(
+        self,
+        pattern: str,
+        tape_name: Optional[str] = None,
+    ) -> tuple[str, str, list]:
+        """
+        Build the FROM and WHERE clauses for a wildcard search.
+
+        Files are aliased as ``f``.
+
+        Returns:
+            (from_clause, where_clause, params) tuple
+        """
+        # Normalize pattern to NFC for cross-platform consistency
+        pattern = normalize_path(pattern)
+
+        # Convert glob pattern to SQL LIKE pattern
+        sql_pattern = pattern.replace("*", "%").replace("?", "_")
+
+        # Check if it's a simple filename search or path search
+        if "/" not in pattern and "\\" not in pattern:
+            # Search just the filename part
+            sql_pattern = "%" + sql_pattern
+
+        # The trigram index can only narrow the search when the pattern
+        # has a run of 3+ literal characters; otherwise scan files directly
+        if self._has_trigram and max(map(len, _LIKE_WILDCARDS.split(sql_pattern))) >= 3:
+            source = "files_trigram t JOIN files f ON f.id = t.rowid"
+            where = "t.path LIKE ?"
+        else:
+            source = "files f"
+            where = "f.path LIKE ?"
+        params: list = [sql_pattern]
+
+        if tape_name:
+            where = f"f.tape_name = ? AND {where}"
+            params.insert(0, tape_name)
+
+        return source, where, params
+
     def search(
         self,
         pattern: str,
         tape_name: Optional[str] = None,
         limit: int = 1000,
+        after: Optional[tuple[str, str]] = None,
     ) -> list[SearchResult]:
         """
         Search for files matching a pattern.
 
+        Results are ordered by (tape_name, path). To fetch the next page,
+        pass the last result's (tape_name, path) as ``after``; this seeks
+        directly in the UNIQUE(tape_name, path) index rather than skipping
+        rows like OFFSET would.
+
         Args:
             pattern: Search pattern (supports * and ? wildcards, or FTS queries)
             tape_name: Optional tape to limit search to
             limit: Maximum number of results
+            after: Only return results after this (tape_name, path)
 
         Returns:
             List of SearchResult objects
         """
-        with self._connection() as conn:
-            cursor = conn.cursor()
+        return list(self.iter_search(pattern, tape_name, limit=limit, after=after))
+
+    def iter_search(
+        self,
+        pattern: str,
+        tape_name: Optional[str] = None,
+        limit: int = 1000,
+        after: Optional[tuple[str, str]] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[SearchResult]:
+        """
+        Search for files matching a pattern, yielding results as they are read.
 
-            # Normalize pattern to NFC for cross-platform consistency
-            pattern = normalize_path(pattern)
+        Same arguments and ordering as search(), but rows are fetched from
+        the cursor batch_size at a time, so memory stays bounded and the
+        first results are available before the query finishes.
 
-            # Convert glob pattern to SQL LIKE pattern
-            sql_pattern = pattern.replace("*", "%").replace("?", "_")
+        Yields:
+            SearchResult objects
+        """
+        source, where, params = self._search_clause(pattern, tape_name)
 
-            # Check if it's a simple filename search or path search
-            if "/" not in pattern and "\\" not in pattern:
-                # Search just the filename part
-                sql_pattern = "%" + sql_pattern
+        if after is not None:
+            where = f"{where} AND (f.tape_name, f.path) > (?, ?)"
+            params = [*params, after[0], normalize_path(after[1])]
 
-            if tape_name:
-                cursor.execute("""
-                    SELECT tape_name, path, size, mtime, xxhash
-                    FROM files
-                    WHERE tape_name = ? AND path LIKE ?
-                    ORDER BY path
-                    LIMIT ?
-                """, (tape_name, sql_pattern, limit))
-            else:
-                cursor.execute("""
-                    SELECT tape_name, path, size, mtime, xxhash
-                    FROM files
-                    WHERE path LIKE ?
-                    ORDER BY tape_name, path
-                    LIMIT ?
-                """, (sql_pattern, limit))
+        # Runs outside _connection(): a single SELECT is already consistent,
+        # and a suspended generator shouldn't hold a transaction open
+        cursor = self._conn().cursor()
+        try:
+            cursor.execute(f"""
+                SELECT f.tape_name, f.path, f.size, f.mtime, f.xxhash
+                FROM {source}
+                WHERE {where}
+                ORDER BY f.tape_name, f.path
+                LIMIT ?
+            """, (*params, limit))
+
+            while rows := cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield _result_from_row(row)
+        finally:
+            cursor.close()
 
-            results = []
-            for row in cursor.fetchall():
-                mtime = None
-                if row["mtime"]:
-                    try:
-                        mtime = datetime.fromisoformat(row["mtime"])
-                    except ValueError:
-                        pass
+    def search_summary(
+        self,
+        pattern: str,
+        tape_name: Optional[str] = None,
+    ) -> list[tuple[str, int, int]]:
+        """
+        Count and total the files matching a pattern, per tape.
 
-                results.append(SearchResult(
-                    tape_name=row["tape_name"],
-                    path=row["path"],
-                    size=row["size"],
-                    mtime=mtime,
-                    xxhash=row["xxhash"],
-                ))
+        Uses the same matching rules as search(), but aggregates in SQL so
+        only one row per tape is returned.
 
-            return results
+        Args:
+            pattern: Search pattern (supports * and ? wildcards)
+            tape_name: Optional tape to limit search to
+
+        Returns:
+            List of (tape_name, file_count, total_bytes) tuples, by tape name
+        """
+        source, where, params = self._search_clause(pattern, tape_name)
+
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(f"""
+                SELECT f.tape_name, COUNT(*) AS count, COALESCE(SUM(f.size), 0) AS total
+                FROM {source}
+                WHERE {where}
+                GROUP BY f.tape_name
+                ORDER BY f.tape_name
+            """, params)
+
+            return [(row["tape_name"], row["count"], row["total"]) for row in cursor.fetchall()]
 
     def search_fts(
         self,
@@ -404,24 +723,7 @@ class CatalogDB:
                     LIMIT ?
                 """, (query, limit))
 
-            results = []
-            for row in cursor.fetchall():
-                mtime = None
-                if row["mtime"]:
-                    try:
-                        mtime = datetime.fromisoformat(row["mtime"])
-                    except ValueError:
-                        pass
-
-                results.append(SearchResult(
-                    tape_name=row["tape_name"],
-                    path=row["path"],
-                    size=row["size"],
-                    mtime=mtime,
-                    xxhash=row["xxhash"],
-                ))
-
-            return results
+            return [_result_from_row(row) for row in cursor.fetchall()]
 
     def find_by_hash(self, xxhash: str) -> list[SearchResult]:
         """
@@ -446,52 +748,94 @@ class CatalogDB:
                 ORDER BY tape_name, path
             """, (xxhash,))
 
-            results = []
-            for row in cursor.fetchall():
-                mtime = None
-                if row["mtime"]:
-                    try:
-                        mtime = datetime.fromisoformat(row["mtime"])
-                    except ValueError:
-                        pass
+            return [_result_from_row(row) for row in cursor.fetchall()]
 
-                results.append(SearchResult(
-                    tape_name=row["tape_name"],
-                    path=row["path"],
-                    size=row["size"],
-                    mtime=mtime,
-                    xxhash=row["xxhash"],
-                ))
+    def find_by_hashes(
+        self,
+        hashes: list[str],
+        chunk_size: int = 999,
+    ) -> dict[str, list[SearchResult]]:
+        """
+        Find files for many hashes at once.
 
-            return results
+        Looks hashes up with one ``IN (...)`` query per chunk rather than
+        one query per hash.
 
-    def find_duplicates(self, min_size: int = 0) -> Iterator[tuple[str, list[SearchResult]]]:
+        Args:
+            hashes: XXHash64 hex strings
+            chunk_size: Hashes per query (kept under SQLite's parameter limit)
+
+        Returns:
+            Dict mapping each hash that was found to its SearchResults,
+            ordered by tape name and path
         """
-        Find duplicate files across all tapes.
+        unique = list(dict.fromkeys(hashes))
+        found: dict[str, list[SearchResult]] = {}
+
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            for start in range(0, len(unique), chunk_size):
+                chunk = unique[start:start + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT tape_name, path, size, mtime, xxhash
+                    FROM files
+                    WHERE xxhash IN ({placeholders})
+                    ORDER BY tape_name, path
+                """, chunk)
+
+                for row in cursor.fetchall():
+                    found.setdefault(row["xxhash"], []).append(_result_from_row(row))
+
+        return found
+
+    def duplicate_hash_summary(
+        self,
+        min_size: int = 0,
+        limit: Optional[int] = None,
+    ) -> list[tuple[str, int, int]]:
+        """
+        Summarize duplicate hashes without fetching the files themselves.
 
         Args:
             min_size: Minimum file size to consider (default: 0)
+            limit: Maximum number of duplicate sets to return (default: all)
 
-        Yields:
-            (xxhash, list of SearchResult) tuples for each duplicate set
+        Returns:
+            List of (xxhash, copies, wasted_bytes) tuples, largest waste first.
+            wasted_bytes is the space taken by all copies beyond the first.
         """
         with self._connection() as conn:
             cursor = conn.cursor()
 
-            # Find hashes that appear more than once
             cursor.execute("""
-                SELECT xxhash, COUNT(*) as count
+                SELECT xxhash, COUNT(*) AS count, SUM(size) - MIN(size) AS wasted
                 FROM files
                 WHERE xxhash IS NOT NULL AND size >= ?
                 GROUP BY xxhash
                 HAVING count > 1
-                ORDER BY count DESC
-            """, (min_size,))
+                ORDER BY wasted DESC, count DESC
+                LIMIT ?
+            """, (min_size, -1 if limit is None else limit))
 
-            for row in cursor.fetchall():
-                xxhash = row["xxhash"]
-                results = self.find_by_hash(xxhash)
-                yield xxhash, results
+            return [(row["xxhash"], row["count"], row["wasted"]) for row in cursor.fetchall()]
+
+    def find_duplicates(self, min_size: int = 0) -> Iterator[tuple[str, list[SearchResult]]]:
+        """
+        Find duplicate files across all tapes.
+
+        Args:
+            min_size: Minimum file size to consider (default: 0)
+
+        Yields:
+            (xxhash, list of SearchResult) tuples for each duplicate set,
+            largest wasted space first
+        """
+        hashes = [xxhash for xxhash, _, _ in self.duplicate_hash_summary(min_size)]
+        members = self.find_by_hashes(hashes)
+        for xxhash in hashes:
+            yield xxhash, members.get(xxhash, [])
 
     def get_tape_stats(self, tape_name: str) -> Optional[TapeStats]:
         """
@@ -637,39 +981,65 @@ class CatalogDB:
         Returns:
             Number of files imported
         """
-        from .mhl import MHL
+        from .mhl import CreatorInfo, HashEntry, TapeInfo, iterparse_mhl
 
-        mhl = MHL.load(mhl_path)
+        # Stream the MHL instead of loading it whole, writing rows in
+        # batches as hashes are parsed
+        tape_info: Optional[TapeInfo] = None
+        archived_str = datetime.now(timezone.utc).isoformat()
+        pending: list[tuple[str, int, Optional[str], str]] = []
+        added = 0
+        tape_ready = False
 
-        # Determine tape name
-        if tape_name is None:
-            if mhl.tape_info and mhl.tape_info.name:
-                tape_name = mhl.tape_info.name
-            else:
-                # Extract from filename (e.g., "TAPE01_source_20250101.mhl")
-                tape_name = mhl_path.stem.split("_")[0]
-
-        # Add tape record
-        self.add_tape(
-            name=tape_name,
-            barcode=mhl.tape_info.serial if mhl.tape_info else None,
-        )
-
-        # Prepare file records
-        files = []
-        for entry in mhl.hashes:
-            files.append((
-                entry.file,
-                entry.size,
-                entry.last_modification_date,
-                entry.xxhash64be,
-            ))
-
-        return self.add_files(
-            tape_name=tape_name,
-            files=files,
-            archived_at=mhl.creator_info.finish_date,
-        )
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            def flush() -> None:
+                nonlocal tape_name, tape_ready, added
+
+                if not tape_ready:
+                    # Determine tape name once the header has been read
+                    if tape_name is None:
+                        if tape_info and tape_info.name:
+                            tape_name = tape_info.name
+                        else:
+                            # Extract from filename (e.g., "TAPE01_source_20250101.mhl")
+                            tape_name = mhl_path.stem.split("_")[0]
+
+                    self._upsert_tape(
+                        cursor,
+                        name=tape_name,
+                        barcode=tape_info.serial if tape_info else None,
+                    )
+                    tape_ready = True
+
+                added += self._upsert_files(cursor, [
+                    (tape_name, path, size, mtime_str, xxhash, archived_str)
+                    for path, size, mtime_str, xxhash in pending
+                ])
+                pending.clear()
+
+            for item in iterparse_mhl(mhl_path):
+                if isinstance(item, HashEntry):
+                    mtime = item.last_modification_date
+                    pending.append((
+                        item.file,
+                        item.size,
+                        mtime.isoformat() if mtime else None,
+                        item.xxhash64be,
+                    ))
+                    if len(pending) >= INSERT_BATCH_SIZE:
+                        flush()
+                elif isinstance(item, CreatorInfo):
+                    if item.finish_date:
+                        archived_str = item.finish_date.isoformat()
+                elif isinstance(item, TapeInfo):
+                    tape_info = item
+
+            flush()
+            self._update_tape_stats(cursor, tape_name)
+
+        return added
 
 
 # Module-level convenience functions
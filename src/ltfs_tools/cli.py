@@ -2,29 +2,55 @@
 Command-line interface for LTFS tools.
 """
 
+import dataclasses
+import os
+import sys
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
 import click
 from rich.console import Console
+from rich.progress import Progress, TaskID
 from rich.table import Table
 
 from . import catalog as catalog_module
-from .config import get_config
-from .mount import mount as mount_func, unmount as unmount_func, format_tape as format_tape_func, get_tape_info, MountError
-from .transfer import transfer as transfer_func, TransferError
+from .config import get_config, is_mount_point
+from .hash import hash_file
+from .mhl import MHL, HashEntry
+from .utils import format_bytes, iter_files, normalize_path
+from .mount import (
+    MountError,
+    format_tape as format_tape_func,
+    get_tape_info,
+    mount as mount_func,
+    tape_order_key,
+    unmount as unmount_func,
+)
+from .transfer import transfer as transfer_func, ExcludeMatcher, TransferError
 from .verify import verify as verify_func, VerifyError
 
+if TYPE_CHECKING:
+    from .catalog_db import CatalogDB
+    from .config import Config
+
 console = Console()
 
 
-def format_bytes(size: int) -> str:
-    """Format bytes to human readable string."""
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size < 1024:
-            return f"{size:.2f} {unit}"
-        size /= 1024
-    return f"{size:.2f} PB"
+# db-search prints plain streamed rows instead of a table above this --limit
+STREAM_THRESHOLD = 5000
+
+
+def _db(config: Optional["Config"] = None) -> "CatalogDB":
+    """Open the catalog database.
+
+    catalog_db (and sqlite3) is imported here rather than at module level so
+    commands that never touch the database don't pay for it at startup.
+    Repeated calls in one process share a connection via CatalogDB.reopen().
+    """
+    from .catalog_db import CatalogDB
+
+    return CatalogDB.reopen(config=config if config is not None else get_config())
 
 
 @click.group()
@@ -219,6 +245,11 @@ def unmount(mount_point: Optional[Path]):
     is_flag=True,
     help="Skip verification after transfer",
 )
+@click.option(
+    "--single-pass",
+    is_flag=True,
+    help="Hash files while copying them instead of hashing first and copying with rsync",
+)
 @click.option(
     "-m", "--mount-point",
     type=click.Path(path_type=Path),
@@ -229,6 +260,7 @@ def transfer(
     tape_name: Optional[str],
     dry_run: bool,
     no_verify: bool,
+    single_pass: bool,
     mount_point: Optional[Path],
 ):
     """Transfer files to an LTFS tape with verification.
@@ -249,6 +281,7 @@ def transfer(
             dry_run=dry_run,
             verify=not no_verify,
             config=config,
+            single_pass=single_pass,
         )
 
         # Print summary
@@ -313,8 +346,7 @@ def transfer(
         )
 
         # Add overall throughput
-        total_mb = result.bytes_total / (1024 * 1024)
-        overall_throughput = total_mb / result.duration_seconds if result.duration_seconds > 0 else 0
+        overall_throughput = result.overall_throughput
         perf_table.add_row(
             "[bold]Overall[/bold]",
             f"[bold]{result.duration_seconds:6.2f}s[/bold]",
@@ -338,6 +370,116 @@ def transfer(
         raise SystemExit(1)
 
 
+# Number of catalog database rows buffered before each insert
+DB_BATCH_SIZE = 10_000
+
+
+def _hash_and_build_mhl(
+    source_files: list[Path],
+    source: Path,
+    dest_dir: Path,
+    mhl: MHL,
+    file_hashes: dict[str, str],
+    progress: Progress,
+    task: TaskID,
+    catalog_tape_dir: Path,
+    db: Optional["CatalogDB"] = None,
+    tape_name: Optional[str] = None,
+) -> int:
+    """
+    Hash source files and write all per-file outputs in a single pass.
+
+    For each file this adds the MHL entry, creates the zero-byte catalog
+    file and queues the catalog database row, so every path is visited
+    once. Modification times in the MHL and catalog come from the tape copy
+    when it exists, since that is what they describe. Database rows are
+    flushed every DB_BATCH_SIZE files; a database failure is reported and
+    disables further database writes without stopping the recovery.
+
+    Returns:
+        Number of files added to the catalog database
+    """
+    # Stamp every entry with one hash date, as transfer's Phase 4 does (MHL
+    # dates have one-second resolution anyway)
+    hash_date = datetime.now(timezone.utc)
+    bytes_hashed = 0
+    db_batch: list[tuple[str, int, Optional[datetime], Optional[str]]] = []
+    db_count = 0
+    archived_at = datetime.now(timezone.utc)
+
+    # Work with plain strings in the loop to avoid per-file Path allocations
+    source_prefix_len = len(os.path.join(os.fspath(source), ""))
+    dest_dir_str = os.fspath(dest_dir)
+    sep = os.sep
+
+    def flush_db() -> None:
+        nonlocal db, db_count
+        if db is not None and db_batch:
+            try:
+                db_count += db.add_files(tape_name, db_batch, archived_at=archived_at)
+            except Exception as e:
+                # Don't fail recovery if database update fails
+                console.print(f"[yellow]Warning:[/yellow] Could not update catalog database: {e}")
+                db = None
+        db_batch.clear()
+
+    for path in source_files:
+        path_str = os.fspath(path)
+        rel_path = normalize_path(path_str[source_prefix_len:])
+        progress.update(task, description=f"Hashing: {rel_path[:60]}")
+
+        try:
+            file_hash = hash_file(path)
+            source_stat = os.stat(path_str)
+            file_size = source_stat.st_size
+
+            # Get mtime from tape file (it's what we'll store in MHL)
+            try:
+                tape_stat = os.stat(dest_dir_str + sep + rel_path)
+            except OSError:
+                tape_stat = None
+            mtime_stat = tape_stat or source_stat
+            mtime = datetime.fromtimestamp(mtime_stat.st_mtime, tz=timezone.utc)
+
+            mhl.add_hash(HashEntry(
+                file=rel_path,
+                size=file_size,
+                xxhash64be=file_hash,
+                last_modification_date=mtime,
+                hash_date=hash_date,
+            ))
+
+            file_hashes[rel_path] = file_hash
+            bytes_hashed += file_size
+            progress.update(task, completed=bytes_hashed)
+        except OSError as e:
+            console.print(f"[yellow]Warning:[/yellow] Could not hash {rel_path}: {e}")
+            continue
+
+        # Zero-byte catalog file preserving the original timestamp from tape
+        catalog_file = catalog_tape_dir / rel_path
+        try:
+            catalog_file.parent.mkdir(parents=True, exist_ok=True)
+            catalog_file.touch()
+            if tape_stat is not None:
+                os.utime(catalog_file, (tape_stat.st_atime, tape_stat.st_mtime))
+        except OSError:
+            pass
+
+        # Database row uses size and mtime from the source file
+        db_batch.append((
+            rel_path,
+            file_size,
+            datetime.fromtimestamp(source_stat.st_mtime, tz=timezone.utc),
+            file_hash,
+        ))
+        if len(db_batch) >= DB_BATCH_SIZE:
+            flush_db()
+
+    flush_db()
+    return db_count
+
+
 @main.command()
 @click.argument("source", type=click.Path(exists=True, path_type=Path))
 @click.argument("tape_name", required=False)
@@ -354,24 +496,26 @@ def recover(source: Path, tape_name: Optional[str]):
     Example:
         ltfs-tool recover /scratch/csilva/deathstar2 deathstar2
     """
-    from datetime import datetime, timezone
     from rich.progress import (
-        Progress, SpinnerColumn, TextColumn, BarColumn,
+        SpinnerColumn, TextColumn, BarColumn,
         TimeElapsedColumn, TransferSpeedColumn, DownloadColumn,
     )
-    from .hash import hash_file
-    from .mhl import MHL, CreatorInfo, HashEntry, TapeInfo
-    from .transfer import normalize_path, _should_exclude
+    from .mhl import CreatorInfo, TapeInfo
 
     config = get_config()
+    # Snapshot config values used in per-file loops (mhl_dir/catalog_dir are properties)
+    is_excluded = ExcludeMatcher(config.excludes).matches
+    mount_point = config.mount_point
+    mhl_dir = config.mhl_dir
+    catalog_dir = config.catalog_dir
     tape_name = tape_name or source.name
     source_name = source.name
 
     if not config.is_mounted():
-        console.print(f"[red]✗[/red] No tape mounted at {config.mount_point}")
+        console.print(f"[red]✗[/red] No tape mounted at {mount_point}")
         raise SystemExit(1)
 
-    dest_dir = config.mount_point / source_name
+    dest_dir = mount_point / source_name
     if not dest_dir.exists():
         console.print(f"[red]✗[/red] Directory not found on tape: {dest_dir}")
         console.print("  Make sure the transfer completed before running recover.")
@@ -387,22 +531,30 @@ def recover(source: Path, tape_name: Optional[str]):
     excluded_count = 0
     total_size = 0
 
-    for path in source.rglob("*"):
-        if path.is_file():
-            rel_path = path.relative_to(source)
-            if _should_exclude(rel_path, config.excludes):
-                excluded_count += 1
-                continue
-            source_files.append(path)
-            total_size += path.stat().st_size
+    inodes: dict[Path, int] = {}
+
+    for entry, rel_str in iter_files(source):
+        if is_excluded(rel_str):
+            excluded_count += 1
+            continue
+        path = Path(entry.path)
+        stat = entry.stat()
+        source_files.append(path)
+        inodes[path] = stat.st_ino
+        total_size += stat.st_size
+
+    # Hash in inode order to keep reads close together on rotational/NFS sources
+    source_files.sort(key=inodes.__getitem__)
 
     console.print(f"  Files: {len(source_files):,}")
     console.print(f"  Excluded: {excluded_count:,}")
     console.print(f"  Size: {format_bytes(total_size)}")
 
-    # Phase 4: Hash source and generate MHL
+    # Phase 4+5: Hash source, generate MHL and update catalog in one pass
     console.print()
-    console.print("[bold blue]Phase 4:[/bold blue] Hashing source files and generating MHL...")
+    console.print(
+        "[bold blue]Phase 4+5:[/bold blue] Hashing source files, generating MHL and catalog..."
+    )
     phase4_start = datetime.now(timezone.utc)
 
     mhl = MHL(
@@ -411,9 +563,20 @@ def recover(source: Path, tape_name: Optional[str]):
     )
     mhl.creator_info.start_date = phase4_start
 
-    # Store hashes for catalog phase
+    # Store hashes for the summary
     file_hashes: dict[str, str] = {}
 
+    catalog_tape_dir = catalog_dir / tape_name / source_name
+    catalog_tape_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        db = _db(config)
+        db.add_tape(name=tape_name)
+    except Exception as e:
+        # Don't fail recovery if database update fails
+        console.print(f"[yellow]Warning:[/yellow] Could not update catalog database: {e}")
+        db = None
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -427,42 +590,15 @@ def recover(source: Path, tape_name: Optional[str]):
         console=console,
     ) as progress:
         task = progress.add_task("Hashing", total=total_size)
-        bytes_hashed = 0
-
-        for path in source_files:
-            rel_path_raw = path.relative_to(source)
-            rel_path = normalize_path(str(rel_path_raw))
-            progress.update(task, description=f"Hashing: {rel_path[:60]}")
-
-            try:
-                file_hash = hash_file(path)
-                file_size = path.stat().st_size
-
-                # Get mtime from tape file (it's what we'll store in MHL)
-                tape_file = dest_dir / rel_path
-                if tape_file.exists():
-                    mtime = datetime.fromtimestamp(tape_file.stat().st_mtime, tz=timezone.utc)
-                else:
-                    mtime = datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
-
-                mhl.add_hash(HashEntry(
-                    file=rel_path,
-                    size=file_size,
-                    xxhash64be=file_hash,
-                    last_modification_date=mtime,
-                    hash_date=datetime.now(timezone.utc),
-                ))
-
-                file_hashes[rel_path] = file_hash
-                bytes_hashed += file_size
-                progress.update(task, completed=bytes_hashed)
-            except OSError as e:
-                console.print(f"[yellow]Warning:[/yellow] Could not hash {rel_path}: {e}")
+        db_count = _hash_and_build_mhl(
+            source_files, source, dest_dir, mhl, file_hashes, progress, task,
+            catalog_tape_dir, db=db, tape_name=tape_name,
+        )
 
     mhl.creator_info.finish_date = datetime.now(timezone.utc)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    mhl_path = config.mhl_dir / f"{tape_name}_{source_name}_{timestamp}.mhl"
+    mhl_path = mhl_dir / f"{tape_name}_{source_name}_{timestamp}.mhl"
     mhl.save(mhl_path)
 
     phase4_end = datetime.now(timezone.utc)
@@ -470,69 +606,9 @@ def recover(source: Path, tape_name: Optional[str]):
     phase4_throughput = (total_size / (1024 * 1024)) / phase4_duration if phase4_duration > 0 else 0
 
     console.print(f"  MHL: {mhl_path}")
-
-    # Phase 5: Update catalog
-    console.print()
-    console.print("[bold blue]Phase 5:[/bold blue] Updating catalog...")
-    phase5_start = datetime.now(timezone.utc)
-
-    catalog_tape_dir = config.catalog_dir / tape_name / source_name
-    catalog_tape_dir.mkdir(parents=True, exist_ok=True)
-
-    for rel_path in file_hashes.keys():
-        tape_file = dest_dir / rel_path
-        catalog_file = catalog_tape_dir / rel_path
-
-        catalog_file.parent.mkdir(parents=True, exist_ok=True)
-        catalog_file.touch()
-
-        # Preserve original timestamp from tape
-        try:
-            import os
-            if tape_file.exists():
-                stat = tape_file.stat()
-                os.utime(catalog_file, (stat.st_atime, stat.st_mtime))
-        except OSError:
-            pass
-
     console.print(f"  Catalog: {catalog_tape_dir}")
-
-    # 5b: Update SQLite catalog database
-    try:
-        from .catalog_db import CatalogDB
-
-        db = CatalogDB(config=config)
-        db.add_tape(name=tape_name)
-
-        # Prepare file records: (path, size, mtime, xxhash)
-        db_files = []
-        for rel_path, file_hash in file_hashes.items():
-            # Get size and mtime from source file (faster than tape)
-            source_file = source / rel_path
-            try:
-                stat = source_file.stat()
-                file_size = stat.st_size
-                mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
-            except OSError:
-                # Fall back to tape file
-                tape_file = dest_dir / rel_path
-                try:
-                    stat = tape_file.stat()
-                    file_size = stat.st_size
-                    mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
-                except OSError:
-                    continue
-
-            db_files.append((rel_path, file_size, mtime, file_hash))
-
-        db.add_files(tape_name, db_files, archived_at=datetime.now(timezone.utc))
-        console.print(f"  Database: {len(db_files):,} files added")
-    except Exception as e:
-        # Don't fail recovery if database update fails
-        console.print(f"[yellow]Warning:[/yellow] Could not update catalog database: {e}")
-
-    phase5_end = datetime.now(timezone.utc)
-    phase5_duration = (phase5_end - phase5_start).total_seconds()
+    if db is not None:
+        console.print(f"  Database: {db_count:,} files added")
 
     # Summary
     console.print()
@@ -544,8 +620,10 @@ def recover(source: Path, tape_name: Optional[str]):
 
     table.add_row("Files", f"{len(file_hashes):,}")
     table.add_row("Size", format_bytes(total_size))
-    table.add_row("Phase 4 (Hash+MHL)", f"{phase4_duration:.1f}s ({phase4_throughput:.1f} MB/s)")
-    table.add_row("Phase 5 (Catalog)", f"{phase5_duration:.1f}s")
+    table.add_row(
+        "Phase 4+5 (Hash+MHL+Catalog)",
+        f"{phase4_duration:.1f}s ({phase4_throughput:.1f} MB/s)",
+    )
     table.add_row("MHL", str(mhl_path))
     table.add_row("Catalog", str(catalog_tape_dir))
 
@@ -568,22 +646,24 @@ def finalize(source_name: str, tape_name: Optional[str]):
     Example:
         ltfs-tool finalize deathstar2
     """
-    from datetime import datetime, timezone
     from rich.progress import (
-        Progress, SpinnerColumn, TextColumn, BarColumn,
+        SpinnerColumn, TextColumn, BarColumn,
         TimeElapsedColumn, TransferSpeedColumn, DownloadColumn,
     )
-    from .hash import hash_file
-    from .mhl import MHL, CreatorInfo, HashEntry, TapeInfo
+    from .mhl import CreatorInfo, TapeInfo
 
     config = get_config()
+    # Snapshot config values (mhl_dir/catalog_dir are computed properties)
+    mount_point = config.mount_point
+    mhl_dir = config.mhl_dir
+    catalog_dir = config.catalog_dir
     tape_name = tape_name or source_name
 
     if not config.is_mounted():
-        console.print(f"[red]✗[/red] No tape mounted at {config.mount_point}")
+        console.print(f"[red]✗[/red] No tape mounted at {mount_point}")
         raise SystemExit(1)
 
-    source_dir = config.mount_point / source_name
+    source_dir = mount_point / source_name
     if not source_dir.exists():
         console.print(f"[red]✗[/red] Directory not found on tape: {source_dir}")
         raise SystemExit(1)
@@ -593,9 +673,18 @@ def finalize(source_name: str, tape_name: Optional[str]):
 
     # Count files and size
     console.print("[dim]Counting files...[/dim]")
-    files = list(source_dir.rglob("*"))
-    files = [f for f in files if f.is_file()]
-    total_size = sum(f.stat().st_size for f in files)
+    files = []
+    total_size = 0
+    for entry, rel_path in iter_files(source_dir):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        files.append((Path(entry.path), rel_path, st.st_size, st.st_atime, st.st_mtime))
+        total_size += st.st_size
+
+    # Read in physical tape order to avoid seeking back and forth
+    files.sort(key=lambda f: tape_order_key(f[0]))
 
     console.print(f"  Files: {len(files):,}")
     console.print(f"  Size: {format_bytes(total_size)}")
@@ -625,22 +714,21 @@ def finalize(source_name: str, tape_name: Optional[str]):
     ) as progress:
         task = progress.add_task("Hashing", total=total_size)
         bytes_hashed = 0
+        # One hash date for the whole run (MHL dates have one-second resolution)
+        hash_date = datetime.now(timezone.utc)
 
-        for path in files:
-            rel_path = str(path.relative_to(source_dir))
+        for path, rel_path, file_size, _, file_mtime in files:
             progress.update(task, description=f"Hashing: {rel_path[:60]}")
 
             try:
                 file_hash = hash_file(path)
-                file_size = path.stat().st_size
-                mtime = datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
 
                 mhl.add_hash(HashEntry(
                     file=rel_path,
                     size=file_size,
                     xxhash64be=file_hash,
-                    last_modification_date=mtime,
-                    hash_date=datetime.now(timezone.utc),
+                    last_modification_date=datetime.fromtimestamp(file_mtime, tz=timezone.utc),
+                    hash_date=hash_date,
                 ))
 
                 bytes_hashed += file_size
@@ -651,7 +739,7 @@ def finalize(source_name: str, tape_name: Optional[str]):
     mhl.creator_info.finish_date = datetime.now(timezone.utc)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    mhl_path = config.mhl_dir / f"{tape_name}_{source_name}_{timestamp}.mhl"
+    mhl_path = mhl_dir / f"{tape_name}_{source_name}_{timestamp}.mhl"
     mhl.save(mhl_path)
 
     phase4_end = datetime.now(timezone.utc)
@@ -664,21 +752,18 @@ def finalize(source_name: str, tape_name: Optional[str]):
     console.print("[bold blue]Phase 5:[/bold blue] Updating catalog...")
     phase5_start = datetime.now(timezone.utc)
 
-    catalog_tape_dir = config.catalog_dir / tape_name / source_name
+    catalog_tape_dir = catalog_dir / tape_name / source_name
     catalog_tape_dir.mkdir(parents=True, exist_ok=True)
 
-    for path in files:
-        rel_path = path.relative_to(source_dir)
+    for _, rel_path, _, file_atime, file_mtime in files:
         catalog_file = catalog_tape_dir / rel_path
 
         catalog_file.parent.mkdir(parents=True, exist_ok=True)
         catalog_file.touch()
 
-        # Preserve original timestamp from tape
+        # Preserve original timestamp from tape (already read during the walk)
         try:
-            import os
-            stat = path.stat()
-            os.utime(catalog_file, (stat.st_atime, stat.st_mtime))
+            os.utime(catalog_file, (file_atime, file_mtime))
         except OSError:
             pass
 
@@ -686,9 +771,7 @@ def finalize(source_name: str, tape_name: Optional[str]):
 
     # 5b: Update SQLite catalog database
     try:
-        from .catalog_db import CatalogDB
-
-        db = CatalogDB(config=config)
+        db = _db(config)
         db.add_tape(name=tape_name)
 
         # Prepare file records from MHL entries
@@ -798,16 +881,6 @@ def info(mount_point: Optional[Path]):
     mount_point = mount_point or config.mount_point
 
     # Check if the specified mount point is actually mounted
-    def is_mount_point(path: Path) -> bool:
-        if not path.exists():
-            return False
-        try:
-            mount_stat = path.stat()
-            parent_stat = path.parent.stat()
-            return mount_stat.st_dev != parent_stat.st_dev
-        except OSError:
-            return False
-
     if not is_mount_point(mount_point):
         console.print(f"[yellow]No tape mounted at {mount_point}[/yellow]")
         raise SystemExit(1)
@@ -1014,6 +1087,56 @@ def catalog_unmount(mount_point: Path):
 # --- Database-backed catalog commands ---
 
 
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    import json
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=_json_default, ensure_ascii=False).encode("utf-8")
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values the stdlib json module doesn't handle."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_record(obj: Any) -> Any:
+    """Convert a dataclass record to a plain dict for JSON output."""
+    return dataclasses.asdict(obj) if dataclasses.is_dataclass(obj) else obj
+
+
+def _write_json(obj: Any) -> None:
+    """Write a JSON document to stdout, bypassing Rich."""
+    out = sys.stdout.buffer
+    out.write(_json_dumps(obj))
+    out.write(b"\n")
+    out.flush()
+
+
+def _write_json_array(items: Iterable[Any]) -> None:
+    """Write a JSON array to stdout one element at a time."""
+    out = sys.stdout.buffer
+    out.write(b"[")
+    sep = b"\n"
+    for item in items:
+        out.write(sep)
+        out.write(_json_dumps(_json_record(item)))
+        sep = b",\n"
+    out.write(b"\n]\n")
+    out.flush()
+
+
+json_option = click.option(
+    "--json", "output_json", is_flag=True, help="Print results as JSON (no tables)"
+)
+
+
 @catalog.command("db-init")
 @click.option("--import-mhls", is_flag=True, help="Import all existing MHL files")
 def catalog_db_init(import_mhls: bool):
@@ -1025,10 +1148,8 @@ def catalog_db_init(import_mhls: bool):
     Example:
         ltfs-tool catalog db-init --import-mhls
     """
-    from .catalog_db import CatalogDB
-
     config = get_config()
-    db = CatalogDB(config=config)
+    db = _db(config)
 
     console.print(f"[green]✓[/green] Database initialized at {db.db_path}")
 
@@ -1042,16 +1163,26 @@ def catalog_db_init(import_mhls: bool):
             return
 
         total_files = 0
-        for mhl_path in mhl_files:
-            try:
-                count = db.import_from_mhl(mhl_path)
-                console.print(f"  {mhl_path.name}: {count} files")
-                total_files += count
-            except Exception as e:
-                console.print(f"  [red]✗[/red] {mhl_path.name}: {e}")
+        failed = 0
+        with db.bulk_transaction():
+            for mhl_path in mhl_files:
+                # Each import runs under its own savepoint, so a failure
+                # leaves none of that file's rows behind
+                try:
+                    count = db.import_from_mhl(mhl_path)
+                    console.print(f"  {mhl_path.name}: {count} files")
+                    total_files += count
+                except Exception as e:
+                    console.print(f"  [red]✗[/red] {mhl_path.name}: {e}")
+                    failed += 1
 
         console.print()
-        console.print(f"[green]✓[/green] Imported {total_files} files from {len(mhl_files)} MHL files")
+        imported = len(mhl_files) - failed
+        console.print(
+            f"[green]✓[/green] Imported {total_files} files from {imported} MHL files"
+        )
+        if failed:
+            console.print(f"[red]✗[/red] {failed} MHL files failed to import and were skipped")
 
 
 @catalog.command("db-search")
@@ -1060,7 +1191,23 @@ def catalog_db_init(import_mhls: bool):
 @click.option("--fts", is_flag=True, help="Use full-text search")
 @click.option("-l", "--limit", default=100, help="Maximum results (default: 100)")
 @click.option("--summary", is_flag=True, help="Show summary instead of file list")
-def catalog_db_search(pattern: str, tape: Optional[str], fts: bool, limit: int, summary: bool):
+@click.option(
+    "--after",
+    metavar="TAPE:PATH",
+    help="Continue after this result (printed at the end of a full page)",
+)
+@click.option("--stream", is_flag=True, help="Print plain tab-separated rows as they are found")
+@json_option
+def catalog_db_search(
+    pattern: str,
+    tape: Optional[str],
+    fts: bool,
+    limit: int,
+    summary: bool,
+    after: Optional[str],
+    stream: bool,
+    output_json: bool,
+):
     """Search for files in the catalog database.
 
     PATTERN supports * and ? wildcards (or FTS queries with --fts).
@@ -1070,29 +1217,50 @@ def catalog_db_search(pattern: str, tape: Optional[str], fts: bool, limit: int,
         ltfs-tool catalog db-search "project*" --tape TEST01
         ltfs-tool catalog db-search "*.mov" --summary
         ltfs-tool catalog db-search "project AND 2024" --fts
+        ltfs-tool catalog db-search "*.mov" --after "TEST01:project/clip.mov"
     """
-    from .catalog_db import CatalogDB
-
-    config = get_config()
-    db = CatalogDB(config=config)
-
-    if fts:
-        results = db.search_fts(pattern, tape, limit=limit)
-    else:
-        results = db.search(pattern, tape, limit=limit)
-
-    if not results:
-        console.print(f"[yellow]No files matching '{pattern}'[/yellow]")
+    after_key = None
+    if after:
+        if fts or summary:
+            raise click.UsageError("--after cannot be combined with --fts or --summary")
+        after_tape, sep, after_path = after.partition(":")
+        if not sep:
+            raise click.BadParameter("expected TAPE:PATH", param_hint="--after")
+        after_key = (after_tape, after_path)
+
+    db = _db()
+
+    if output_json:
+        if summary:
+            if fts:
+                raise click.UsageError("--json cannot be combined with --fts --summary")
+            _write_json([
+                {"tape_name": name, "file_count": count, "total_bytes": size}
+                for name, count, size in db.search_summary(pattern, tape)
+            ])
+        elif fts:
+            _write_json_array(db.search_fts(pattern, tape, limit=limit))
+        else:
+            _write_json_array(db.iter_search(pattern, tape, limit=limit, after=after_key))
         return
 
     if summary:
-        # Group by tape and show totals
-        tape_stats: dict[str, tuple[int, int]] = {}
-        for r in results:
-            if r.tape_name not in tape_stats:
-                tape_stats[r.tape_name] = (0, 0)
-            count, size = tape_stats[r.tape_name]
-            tape_stats[r.tape_name] = (count + 1, size + r.size)
+        if fts:
+            # FTS results are ranked and limited, so group the returned rows
+            tape_totals: dict[str, tuple[int, int]] = {}
+            for r in db.search_fts(pattern, tape, limit=limit):
+                count, size = tape_totals.get(r.tape_name, (0, 0))
+                tape_totals[r.tape_name] = (count + 1, size + r.size)
+            tape_stats = [
+                (name, count, size) for name, (count, size) in sorted(tape_totals.items())
+            ]
+        else:
+            # Aggregate per tape in SQL; covers all matches, not just --limit
+            tape_stats = db.search_summary(pattern, tape)
+
+        if not tape_stats:
+            console.print(f"[yellow]No files matching '{pattern}'[/yellow]")
+            return
 
         console.print(f"[bold]Files matching '{pattern}'[/bold]")
         console.print()
@@ -1104,7 +1272,7 @@ def catalog_db_search(pattern: str, tape: Optional[str], fts: bool, limit: int,
 
         total_files = 0
         total_size = 0
-        for tape_name, (count, size) in sorted(tape_stats.items()):
+        for tape_name, count, size in tape_stats:
             table.add_row(tape_name, str(count), format_bytes(size))
             total_files += count
             total_size += size
@@ -1112,26 +1280,59 @@ def catalog_db_search(pattern: str, tape: Optional[str], fts: bool, limit: int,
         console.print(table)
         console.print()
         console.print(f"[bold]Total:[/bold] {total_files} files, {format_bytes(total_size)} across {len(tape_stats)} tape(s)")
+        return
+
+    if not fts and (stream or limit > STREAM_THRESHOLD):
+        # Large result sets: print rows as the cursor yields them rather than
+        # holding them all for a Rich table
+        count = 0
+        last = None
+        for last in db.iter_search(pattern, tape, limit=limit, after=after_key):
+            click.echo(f"{last.tape_name}\t{format_bytes(last.size)}\t{last.path}")
+            count += 1
+
+        if count == 0:
+            console.print(f"[yellow]No files matching '{pattern}'[/yellow]")
+            return
+
+        console.print(f"Found {count} file(s)" + (f" (limit: {limit})" if count == limit else ""))
+        if count == limit:
+            console.print(f"[dim]Next page: --after \"{last.tape_name}:{last.path}\"[/dim]")
+        return
+
+    if fts:
+        results = db.search_fts(pattern, tape, limit=limit)
     else:
-        console.print(f"[bold]Files matching '{pattern}'[/bold]")
-        console.print()
+        results = db.search(pattern, tape, limit=limit, after=after_key)
 
-        table = Table()
-        table.add_column("Tape")
-        table.add_column("Size", justify="right")
-        table.add_column("Path")
+    if not results:
+        console.print(f"[yellow]No files matching '{pattern}'[/yellow]")
+        return
 
-        for r in results:
-            table.add_row(r.tape_name, format_bytes(r.size), r.path)
+    console.print(f"[bold]Files matching '{pattern}'[/bold]")
+    console.print()
 
-        console.print(table)
-        console.print()
-        console.print(f"Found {len(results)} file(s)" + (f" (limit: {limit})" if len(results) == limit else ""))
+    table = Table()
+    table.add_column("Tape")
+    table.add_column("Size", justify="right")
+    table.add_column("Path")
+
+    for r in results:
+        table.add_row(r.tape_name, format_bytes(r.size), r.path)
+
+    console.print(table)
+    console.print()
+    limit_note = f" (limit: {limit})" if len(results) == limit else ""
+    console.print(f"Found {len(results)} file(s){limit_note}")
+    if len(results) == limit and not fts:
+        last = results[-1]
+        console.print(f"[dim]Next page: --after \"{last.tape_name}:{last.path}\"[/dim]")
 
 
 @catalog.command("db-stats")
 @click.argument("tape_name", required=False)
-def catalog_db_stats(tape_name: Optional[str]):
+@json_option
+def catalog_db_stats(tape_name: Optional[str], output_json: bool):
     """Show catalog database statistics.
 
     If TAPE_NAME is provided, shows stats for that tape only.
@@ -1141,10 +1342,19 @@ def catalog_db_stats(tape_name: Optional[str]):
         ltfs-tool catalog db-stats
         ltfs-tool catalog db-stats TEST01
     """
-    from .catalog_db import CatalogDB
+    db = _db()
 
-    config = get_config()
-    db = CatalogDB(config=config)
+    if output_json:
+        if tape_name:
+            stats = db.get_tape_stats(tape_name)
+            _write_json(_json_record(stats) if stats else None)
+        else:
+            _write_json({
+                "database": str(db.db_path),
+                **db.get_summary(),
+                "tapes": [_json_record(t) for t in db.list_tapes()],
+            })
+        return
 
     if tape_name:
         stats = db.get_tape_stats(tape_name)
@@ -1198,22 +1408,37 @@ def catalog_db_stats(tape_name: Optional[str]):
 
 
 @catalog.command("db-find-hash")
-@click.argument("xxhash")
-def catalog_db_find_hash(xxhash: str):
+@click.argument("xxhash", required=False)
+@click.option(
+    "-f", "--file", "hash_file_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Look up every hash listed in FILE (one per line, first column)",
+)
+@json_option
+def catalog_db_find_hash(xxhash: Optional[str], hash_file_path: Optional[Path], output_json: bool):
     """Find files by XXHash64.
 
     Useful for checking if a file exists in the archive or finding duplicates.
 
-    Example:
+    Examples:
         ltfs-tool catalog db-find-hash abc123def456789
+        ltfs-tool catalog db-find-hash --file hashes.txt
     """
-    from .catalog_db import CatalogDB
+    if hash_file_path:
+        _find_hashes_from_file(hash_file_path, output_json)
+        return
 
-    config = get_config()
-    db = CatalogDB(config=config)
+    if not xxhash:
+        raise click.UsageError("Provide an XXHASH argument or --file")
+
+    db = _db()
 
     results = db.find_by_hash(xxhash)
 
+    if output_json:
+        _write_json_array(results)
+        return
+
     if not results:
         console.print(f"[yellow]No files with hash '{xxhash}'[/yellow]")
         return
@@ -1234,10 +1459,59 @@ def catalog_db_find_hash(xxhash: str):
     console.print(f"Found {len(results)} file(s)")
 
 
+def _find_hashes_from_file(hash_file_path: Path, output_json: bool = False) -> None:
+    """Look up all hashes listed in a file with batched queries."""
+    hashes = []
+    with open(hash_file_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                # Accept "hash" or "hash  path" (xxhsum-style) lines
+                hashes.append(line.split()[0].lower())
+
+    if not hashes and not output_json:
+        console.print(f"[yellow]No hashes found in {hash_file_path}[/yellow]")
+        return
+
+    db = _db()
+    found = db.find_by_hashes(hashes)
+
+    if output_json:
+        _write_json({
+            h: [_json_record(r) for r in found.get(h, ())]
+            for h in dict.fromkeys(hashes)
+        })
+        return
+
+    unique_hashes = list(dict.fromkeys(hashes))
+    missing = [h for h in unique_hashes if h not in found]
+
+    if found:
+        table = Table()
+        table.add_column("Hash")
+        table.add_column("Tape")
+        table.add_column("Size", justify="right")
+        table.add_column("Path")
+
+        for h in unique_hashes:
+            for r in found.get(h, ()):
+                table.add_row(h, r.tape_name, format_bytes(r.size), r.path)
+
+        console.print(table)
+        console.print()
+
+    console.print(f"Found {len(found)} of {len(unique_hashes)} hash(es)")
+    if missing:
+        console.print(f"[yellow]Not in catalog ({len(missing)}):[/yellow]")
+        for h in missing:
+            console.print(f"  {h}")
+
+
 @catalog.command("db-duplicates")
 @click.option("--min-size", default=1048576, help="Minimum file size in bytes (default: 1MB)")
 @click.option("-l", "--limit", default=50, help="Maximum duplicate sets to show (default: 50)")
-def catalog_db_duplicates(min_size: int, limit: int):
+@json_option
+def catalog_db_duplicates(min_size: int, limit: int, output_json: bool):
     """Find duplicate files across all tapes.
 
     Shows files that exist on multiple tapes (same XXHash64).
@@ -1245,10 +1519,25 @@ def catalog_db_duplicates(min_size: int, limit: int):
     Example:
         ltfs-tool catalog db-duplicates --min-size 10485760
     """
-    from .catalog_db import CatalogDB
-
-    config = get_config()
-    db = CatalogDB(config=config)
+    db = _db()
+
+    # Aggregate and limit in SQL, then fetch members only for the sets shown
+    summary = db.duplicate_hash_summary(min_size=min_size, limit=limit + 1)
+    truncated = len(summary) > limit
+    summary = summary[:limit]
+    members = db.find_by_hashes([xxhash for xxhash, _, _ in summary])
+
+    if output_json:
+        _write_json_array(
+            {
+                "xxhash": xxhash,
+                "copies": copies,
+                "wasted_bytes": wasted,
+                "files": [_json_record(f) for f in members.get(xxhash, ())],
+            }
+            for xxhash, copies, wasted in summary
+        )
+        return
 
     console.print(f"[bold]Finding duplicates (min size: {format_bytes(min_size)})[/bold]")
     console.print()
@@ -1256,23 +1545,21 @@ def catalog_db_duplicates(min_size: int, limit: int):
     count = 0
     total_wasted = 0
 
-    for xxhash, files in db.find_duplicates(min_size=min_size):
-        if count >= limit:
-            console.print(f"[dim]... (showing first {limit} duplicate sets)[/dim]")
-            break
-
-        # Calculate wasted space (all copies except one)
-        file_size = files[0].size
-        wasted = file_size * (len(files) - 1)
+    for xxhash, copies, wasted in summary:
+        files = members.get(xxhash, [])
         total_wasted += wasted
 
-        console.print(f"[cyan]{xxhash}[/cyan] ({format_bytes(file_size)}, {len(files)} copies)")
+        file_size = files[0].size if files else 0
+        console.print(f"[cyan]{xxhash}[/cyan] ({format_bytes(file_size)}, {copies} copies)")
         for f in files:
             console.print(f"  [{f.tape_name}] {f.path}")
         console.print()
 
         count += 1
 
+    if truncated:
+        console.print(f"[dim]... (showing first {limit} duplicate sets)[/dim]")
+
     if count == 0:
         console.print("[green]No duplicates found[/green]")
     else:
@@ -1290,10 +1577,7 @@ def catalog_db_import(mhl_file: Path, tape: Optional[str]):
         ltfs-tool catalog db-import /path/to/archive.mhl
         ltfs-tool catalog db-import archive.mhl --tape BACKUP01
     """
-    from .catalog_db import CatalogDB
-
-    config = get_config()
-    db = CatalogDB(config=config)
+    db = _db()
 
     try:
         count = db.import_from_mhl(mhl_file, tape_name=tape)
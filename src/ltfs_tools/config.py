@@ -1,18 +1,54 @@
 """
 Configuration and platform detection for LTFS tools.
+
+Device and binary detection results are cached for the lifetime of the
+process (call ``<function>.cache_clear()`` to force re-detection), so
+constructing several Config instances only shells out to lsscsi /
+system_profiler once.
 """
 
+import functools
 import os
 import platform
+import re
 import shutil
 import subprocess
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
+# Primary (auto-rewind, default mode) tape device names in /sys/class/scsi_tape
+_SYSFS_TAPE_NAME = re.compile(r"st\d+")
+
+
+def _detect_tape_device_sysfs() -> Optional[str]:
+    """Find the SCSI generic device of the first tape drive via sysfs."""
+    try:
+        names = [
+            name for name in os.listdir("/sys/class/scsi_tape") if _SYSFS_TAPE_NAME.fullmatch(name)
+        ]
+        names.sort(key=lambda name: int(name[2:]))
+    except OSError:
+        return None
+
+    for name in names:
+        try:
+            # device/generic is a symlink to .../scsi_generic/sgN
+            target = os.readlink(f"/sys/class/scsi_tape/{name}/device/generic")
+        except OSError:
+            continue
+        return "/dev/" + os.path.basename(target)
+    return None
+
 
+@functools.lru_cache(maxsize=1)
 def detect_tape_device_linux() -> Optional[str]:
-    """Auto-detect tape device on Linux using lsscsi -g."""
+    """Auto-detect tape device on Linux from sysfs, falling back to lsscsi -g."""
+    device = _detect_tape_device_sysfs()
+    if device:
+        return device
+
     try:
         result = subprocess.run(
             ["lsscsi", "-g"],
@@ -34,6 +70,7 @@ def detect_tape_device_linux() -> Optional[str]:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def detect_tape_device_macos() -> Optional[str]:
     """Auto-detect tape device on macOS by scanning IOKit."""
     try:
@@ -55,6 +92,7 @@ def detect_tape_device_macos() -> Optional[str]:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def find_ltfs_binary_macos() -> Optional[Path]:
     """Find LTFS binary on macOS, checking multiple possible locations."""
     # Check if ltfs is in PATH first
@@ -76,6 +114,7 @@ def find_ltfs_binary_macos() -> Optional[Path]:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def find_mkltfs_binary_macos() -> Optional[Path]:
     """Find mkltfs binary on macOS, checking multiple possible locations."""
     # Check if mkltfs is in PATH first
@@ -97,6 +136,48 @@ def find_mkltfs_binary_macos() -> Optional[Path]:
     return None
 
 
+# Octal escapes (e.g. \040 for a space) used in /proc/self/mountinfo paths
+_MOUNTINFO_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+def _linux_mount_points() -> Optional[set[str]]:
+    """Read mount points from /proc/self/mountinfo, or None if unavailable."""
+    try:
+        with open("/proc/self/mountinfo", encoding="utf-8", errors="surrogateescape") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    mount_points = set()
+    for line in lines:
+        fields = line.split(" ", 5)
+        if len(fields) > 4:
+            mount_points.add(
+                _MOUNTINFO_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), fields[4])
+            )
+    return mount_points
+
+
+def is_mount_point(path: Path) -> bool:
+    """
+    Check whether a path is a mount point.
+
+    On Linux this first looks the path up in /proc/self/mountinfo, which is
+    read from memory and so can't block on an unresponsive LTFS mount the
+    way stat() on the mount point can. Paths not listed there (or other
+    platforms) fall back to os.path.ismount.
+    """
+    if sys.platform.startswith("linux"):
+        mount_points = _linux_mount_points()
+        if mount_points is not None and os.path.abspath(path) in mount_points:
+            return True
+
+    try:
+        return os.path.ismount(path)
+    except OSError:
+        return False
+
+
 @dataclass
 class PlatformConfig:
     """Platform-specific configuration."""
@@ -149,6 +230,7 @@ LINUX_CONFIG = PlatformConfig(
 )
 
 
+@functools.lru_cache(maxsize=1)
 def get_platform_config() -> PlatformConfig:
     """Detect platform and return appropriate configuration."""
     system = platform.system().lower()
@@ -250,15 +332,7 @@ class Config:
 
     def is_mounted(self) -> bool:
         """Check if a tape is mounted at the mount point."""
-        if not self.mount_point.exists():
-            return False
-        # Check if it's a mount point by comparing device IDs
-        try:
-            mount_stat = self.mount_point.stat()
-            parent_stat = self.mount_point.parent.stat()
-            return mount_stat.st_dev != parent_stat.st_dev
-        except OSError:
-            return False
+        return is_mount_point(self.mount_point)
 
 
 # Global config instance (can be overridden in tests)
@@ -4,14 +4,48 @@ LTFS index parsing and manipulation.
 Parses LTFS index XML files to extract filesystem metadata.
 """
 
-import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+import functools
+import sys
+from array import array
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
+from .utils import DATACLASS_SLOTS
 
-@dataclass
+try:
+    # libxml2-backed parser; much faster on multi-megabyte indexes. Named ET
+    # like the stdlib fallback below so the rest of the module uses either.
+    from lxml import etree as ET  # noqa: N812
+
+    # LTFS nests two elements (directory/contents) per directory level, so deep
+    # trees can exceed libxml2's default depth limit without huge_tree
+    _ITERPARSE_OPTIONS = {"huge_tree": True}
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+    _ITERPARSE_OPTIONS = {}
+
+
+@functools.lru_cache(maxsize=65536)
+def _parse_time(time_str: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an LTFS timestamp to datetime.
+
+    Files copied in one batch tend to share timestamps, so results are
+    memoized; datetimes are immutable, so sharing them is safe.
+    """
+    if not time_str:
+        return None
+    try:
+        # LTFS uses ISO 8601 format: 2025-12-06T15:30:00Z
+        return datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        return None
+
+
+@dataclass(**DATACLASS_SLOTS)
 class FileExtent:
     """Physical location of file data on tape."""
     partition: str  # 'a' or 'b'
@@ -20,7 +54,7 @@ class FileExtent:
     byte_count: int
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class IndexFile:
     """File metadata from LTFS index."""
     name: str
@@ -35,7 +69,7 @@ class IndexFile:
     uid: Optional[str] = None  # File UID for deduplication
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class IndexDirectory:
     """Directory metadata from LTFS index."""
     name: str
@@ -61,6 +95,79 @@ class LTFSIndex:
     comment: Optional[str]
     root: IndexDirectory
 
+    # Flattened views filled in by LTFSIndexParser.get_all_files/_directories
+    _all_files: Optional[List[IndexFile]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _all_dirs: Optional[List[IndexDirectory]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def to_columns(self) -> 'IndexColumns':
+        """Build a column-oriented view of every file in the index."""
+        files = LTFSIndexParser.get_all_files(self)
+
+        partitions = array('B')
+        start_blocks = array('q')
+        for file in files:
+            if file.extents:
+                extent = file.extents[0]
+                partitions.append(ord(extent.partition[:1] or '\0'))
+                start_blocks.append(extent.start_block)
+            else:
+                partitions.append(0)
+                start_blocks.append(0)
+
+        return IndexColumns(
+            paths=[file.path for file in files],
+            sizes=array('q', [file.size for file in files]),
+            partitions=partitions,
+            start_blocks=start_blocks,
+        )
+
+
+@dataclass
+class IndexColumns:
+    """
+    Files of an LTFS index stored as parallel columns.
+
+    Row i of every column describes the same file. Numeric columns are packed
+    arrays rather than one Python object per value, which keeps large tapes
+    compact and makes aggregates like total_size() a single C-level loop.
+    """
+    paths: List[str]
+    sizes: array  # int64 byte counts
+    partitions: array  # Partition letter of the first extent as a byte, 0 if none
+    start_blocks: array  # int64 start block of the first extent, 0 if none
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def total_size(self) -> int:
+        """Total size of all files in bytes."""
+        return sum(self.sizes)
+
+    def tape_order(self) -> List[int]:
+        """
+        Row indices sorted by where each file starts on tape.
+
+        Reading files in this order (partition, then start block) avoids
+        seeking back and forth when restoring many files from one tape.
+        """
+        keys = sorted(zip(self.partitions, self.start_blocks, range(len(self.paths))))
+        return [row for _, _, row in keys]
+
+
+def _join_path(parent_path: str, name: str) -> str:
+    """Join an index path and a child name without scanning for '//'."""
+    if parent_path == '/':
+        return '/' + name
+    return parent_path + '/' + name
+
+
+# Clark-notation prefix for the LTFS namespace
+_LTFS = '{http://www.ibm.com/xmlns/ltfs}'
+
 
 class LTFSIndexParser:
     """Parse LTFS index XML files."""
@@ -68,91 +175,109 @@ class LTFSIndexParser:
     # LTFS XML namespace
     NS = {'ltfs': 'http://www.ibm.com/xmlns/ltfs'}
 
+    # Namespace-qualified tags; lookups with these skip resolving the
+    # 'ltfs:' prefix through NS on every call
+    _TAG_NAME = _LTFS + 'name'
+    _TAG_LENGTH = _LTFS + 'length'
+    _TAG_READONLY = _LTFS + 'readonly'
+    _TAG_FILEUID = _LTFS + 'fileuid'
+    _TAG_MODIFYTIME = _LTFS + 'modifytime'
+    _TAG_CREATIONTIME = _LTFS + 'creationtime'
+    _TAG_CHANGETIME = _LTFS + 'changetime'
+    _TAG_ACCESSTIME = _LTFS + 'accesstime'
+    _TAG_PARTITION = _LTFS + 'partition'
+    _TAG_STARTBLOCK = _LTFS + 'startblock'
+    _TAG_BYTEOFFSET = _LTFS + 'byteoffset'
+    _TAG_BYTECOUNT = _LTFS + 'bytecount'
+    _TAG_CONTENTS = _LTFS + 'contents'
+    _TAG_FILE = _LTFS + 'file'
+    _TAG_DIR = _LTFS + 'directory'
+    _TAG_VOLUMEUUID = _LTFS + 'volumeuuid'
+    _TAG_GENERATIONNUMBER = _LTFS + 'generationnumber'
+    _TAG_UPDATETIME = _LTFS + 'updatetime'
+    _TAG_LOCATION = _LTFS + 'location'
+    _TAG_COMMENT = _LTFS + 'comment'
+    _TAG_CREATOR = _LTFS + 'creator'
+    _TAG_EXTENTINFO = _LTFS + 'extentinfo'
+    _TAG_EXTENT = _LTFS + 'extent'
+
     @staticmethod
     def parse_time(time_str: Optional[str]) -> Optional[datetime]:
         """Parse LTFS timestamp to datetime."""
-        if not time_str:
-            return None
-        try:
-            # LTFS uses ISO 8601 format: 2025-12-06T15:30:00Z
-            return datetime.fromisoformat(time_str.replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            return None
+        return _parse_time(time_str)
 
     @classmethod
     def parse_file(cls, file_elem: ET.Element, parent_path: str) -> IndexFile:
         """Parse file element from index."""
-        name = file_elem.findtext('ltfs:name', namespaces=cls.NS, default='')
-        full_path = f"{parent_path}/{name}".replace('//', '/')
-
-        size = int(file_elem.findtext('ltfs:length', namespaces=cls.NS, default='0'))
-        readonly = file_elem.findtext('ltfs:readonly', namespaces=cls.NS, default='false') == 'true'
-        uid = file_elem.findtext('ltfs:fileuid', namespaces=cls.NS)
-
-        # Parse timestamps
-        modify_time = cls.parse_time(file_elem.findtext('ltfs:modifytime', namespaces=cls.NS))
-        create_time = cls.parse_time(file_elem.findtext('ltfs:creationtime', namespaces=cls.NS))
-        change_time = cls.parse_time(file_elem.findtext('ltfs:changetime', namespaces=cls.NS))
-        access_time = cls.parse_time(file_elem.findtext('ltfs:accesstime', namespaces=cls.NS))
-
-        # Parse extents (physical locations)
+        # Gather child texts in one pass over the element rather than
+        # rescanning its children with a findtext() per field
+        fields = {}
         extents = []
-        for extent_elem in file_elem.findall('ltfs:extentinfo', namespaces=cls.NS):
-            partition = extent_elem.findtext('ltfs:partition', namespaces=cls.NS, default='b')
-            start_block = int(extent_elem.findtext('ltfs:startblock', namespaces=cls.NS, default='0'))
-            byte_offset = int(extent_elem.findtext('ltfs:byteoffset', namespaces=cls.NS, default='0'))
-            byte_count = int(extent_elem.findtext('ltfs:bytecount', namespaces=cls.NS, default='0'))
-
-            extents.append(FileExtent(
-                partition=partition,
-                start_block=start_block,
-                byte_offset=byte_offset,
-                byte_count=byte_count
-            ))
+        for child in file_elem:
+            tag = child.tag
+            if tag == cls._TAG_EXTENTINFO:
+                # Parse extents (physical locations)
+                for extent_elem in child:
+                    if extent_elem.tag == cls._TAG_EXTENT:
+                        extents.append(cls._parse_extent(extent_elem))
+            elif tag not in fields:
+                fields[tag] = child.text or ''
+
+        # Names repeat a lot across a tape (camera card layouts, sidecar
+        # files), so share one string object per distinct name
+        name = sys.intern(fields.get(cls._TAG_NAME, ''))
 
         return IndexFile(
             name=name,
-            path=full_path,
-            size=size,
-            modify_time=modify_time,
-            create_time=create_time,
-            change_time=change_time,
-            access_time=access_time,
-            readonly=readonly,
+            path=_join_path(parent_path, name),
+            size=int(fields.get(cls._TAG_LENGTH, '0')),
+            modify_time=_parse_time(fields.get(cls._TAG_MODIFYTIME)),
+            create_time=_parse_time(fields.get(cls._TAG_CREATIONTIME)),
+            change_time=_parse_time(fields.get(cls._TAG_CHANGETIME)),
+            access_time=_parse_time(fields.get(cls._TAG_ACCESSTIME)),
+            readonly=fields.get(cls._TAG_READONLY, 'false') == 'true',
             extents=extents,
-            uid=uid
+            uid=fields.get(cls._TAG_FILEUID)
         )
 
     @classmethod
-    def parse_directory(cls, dir_elem: ET.Element, parent_path: str = '') -> IndexDirectory:
-        """Parse directory element from index (recursive)."""
-        name = dir_elem.findtext('ltfs:name', namespaces=cls.NS, default='')
+    def _parse_extent(cls, extent_elem: ET.Element) -> FileExtent:
+        """Parse an extent element from a file's extentinfo."""
+        fields = {}
+        for child in extent_elem:
+            fields.setdefault(child.tag, child.text or '')
+
+        return FileExtent(
+            partition=fields.get(cls._TAG_PARTITION, 'b'),
+            start_block=int(fields.get(cls._TAG_STARTBLOCK, '0')),
+            byte_offset=int(fields.get(cls._TAG_BYTEOFFSET, '0')),
+            byte_count=int(fields.get(cls._TAG_BYTECOUNT, '0'))
+        )
+
+    @staticmethod
+    def _directory_path(name: str, parent_path: str) -> str:
+        """Full path of a directory; the root directory has no parent path."""
         if parent_path:
-            full_path = f"{parent_path}/{name}".replace('//', '/')
-        else:
-            full_path = '/'
+            return _join_path(parent_path, name)
+        return '/'
 
-        readonly = dir_elem.findtext('ltfs:readonly', namespaces=cls.NS, default='false') == 'true'
+    @classmethod
+    def _build_directory(
+        cls,
+        dir_elem: ET.Element,
+        full_path: str,
+        files: List[IndexFile],
+        subdirs: List['IndexDirectory'],
+    ) -> IndexDirectory:
+        """Build an IndexDirectory from a directory element's own metadata."""
+        name = sys.intern(dir_elem.findtext(cls._TAG_NAME, default=''))
+        readonly = dir_elem.findtext(cls._TAG_READONLY, default='false') == 'true'
 
         # Parse timestamps
-        modify_time = cls.parse_time(dir_elem.findtext('ltfs:modifytime', namespaces=cls.NS))
-        create_time = cls.parse_time(dir_elem.findtext('ltfs:creationtime', namespaces=cls.NS))
-        change_time = cls.parse_time(dir_elem.findtext('ltfs:changetime', namespaces=cls.NS))
-        access_time = cls.parse_time(dir_elem.findtext('ltfs:accesstime', namespaces=cls.NS))
-
-        # Parse contents
-        files = []
-        subdirs = []
-
-        contents_elem = dir_elem.find('ltfs:contents', namespaces=cls.NS)
-        if contents_elem is not None:
-            # Parse files
-            for file_elem in contents_elem.findall('ltfs:file', namespaces=cls.NS):
-                files.append(cls.parse_file(file_elem, full_path))
-
-            # Parse subdirectories (recursive)
-            for subdir_elem in contents_elem.findall('ltfs:directory', namespaces=cls.NS):
-                subdirs.append(cls.parse_directory(subdir_elem, full_path))
+        modify_time = cls.parse_time(dir_elem.findtext(cls._TAG_MODIFYTIME))
+        create_time = cls.parse_time(dir_elem.findtext(cls._TAG_CREATIONTIME))
+        change_time = cls.parse_time(dir_elem.findtext(cls._TAG_CHANGETIME))
+        access_time = cls.parse_time(dir_elem.findtext(cls._TAG_ACCESSTIME))
 
         return IndexDirectory(
             name=name,
@@ -166,34 +291,105 @@ class LTFSIndexParser:
             subdirs=subdirs
         )
 
+    @classmethod
+    def parse_directory(cls, dir_elem: ET.Element, parent_path: str = '') -> IndexDirectory:
+        """Parse directory element from index (recursive)."""
+        name = dir_elem.findtext(cls._TAG_NAME, default='')
+        full_path = cls._directory_path(name, parent_path)
+
+        # Parse contents
+        files = []
+        subdirs = []
+
+        contents_elem = dir_elem.find(cls._TAG_CONTENTS)
+        if contents_elem is not None:
+            # Parse files and subdirectories (recursive) in one pass
+            for child in contents_elem:
+                tag = child.tag
+                if tag == cls._TAG_FILE:
+                    files.append(cls.parse_file(child, full_path))
+                elif tag == cls._TAG_DIR:
+                    subdirs.append(cls.parse_directory(child, full_path))
+
+        return cls._build_directory(dir_elem, full_path, files, subdirs)
+
     @classmethod
     def parse(cls, index_file: Path) -> LTFSIndex:
-        """Parse an LTFS index XML file."""
-        tree = ET.parse(index_file)
-        root_elem = tree.getroot()
+        """
+        Parse an LTFS index XML file.
+
+        The directory tree is built incrementally while the file is read,
+        using an explicit stack rather than recursion, and each file and
+        directory element is discarded once it has been converted. Memory
+        therefore holds the resulting dataclasses but never the full XML
+        tree as well, and deeply nested tapes can't hit the recursion limit.
+        """
+        dir_tag = cls._TAG_DIR
+        contents_tag = cls._TAG_CONTENTS
+        file_tag = cls._TAG_FILE
+
+        root_elem = None
+        root_dir = None
+        # One frame per open directory: [element, full path, files, subdirs, contents]
+        stack = []
+
+        def frame_path() -> str:
+            # Called while the frame is on top of the stack, after its <name>
+            name = stack[-1][0].findtext(cls._TAG_NAME, default='')
+            parent_path = stack[-2][1] if len(stack) > 1 else ''
+            return cls._directory_path(name, parent_path)
+
+        for event, elem in ET.iterparse(str(index_file), ("start", "end"), **_ITERPARSE_OPTIONS):
+            tag = elem.tag
+
+            if event == "start":
+                if root_elem is None:
+                    root_elem = elem
+                elif tag == dir_tag:
+                    stack.append([elem, None, [], [], None])
+                elif tag == contents_tag and stack and stack[-1][4] is None:
+                    # <name> precedes <contents>, so the path is known by now
+                    stack[-1][1] = frame_path()
+                    stack[-1][4] = elem
+                continue
+
+            if not stack:
+                continue
+
+            frame = stack[-1]
+            if tag == file_tag and frame[4] is not None:
+                frame[2].append(cls.parse_file(elem, frame[1]))
+                # Drop converted elements so the XML tree never fills up
+                del frame[4][:]
+            elif tag == dir_tag and elem is frame[0]:
+                full_path = frame[1] if frame[1] is not None else frame_path()
+                stack.pop()
+                directory = cls._build_directory(elem, full_path, frame[2], frame[3])
+                if stack:
+                    stack[-1][3].append(directory)
+                    if stack[-1][4] is not None:
+                        del stack[-1][4][:]
+                elif root_dir is None:
+                    root_dir = directory
 
         # Parse index metadata
         version = root_elem.get('version', 'unknown')
-        volume_uuid = root_elem.findtext('ltfs:volumeuuid', namespaces=cls.NS, default='')
-        generation = int(root_elem.findtext('ltfs:generationnumber', namespaces=cls.NS, default='0'))
-        update_time = cls.parse_time(root_elem.findtext('ltfs:updatetime', namespaces=cls.NS))
-        location = root_elem.findtext('ltfs:location', namespaces=cls.NS, default='')
-        comment = root_elem.findtext('ltfs:comment', namespaces=cls.NS)
+        volume_uuid = root_elem.findtext(cls._TAG_VOLUMEUUID, default='')
+        generation = int(root_elem.findtext(cls._TAG_GENERATIONNUMBER, default='0'))
+        update_time = cls.parse_time(root_elem.findtext(cls._TAG_UPDATETIME))
+        location = root_elem.findtext(cls._TAG_LOCATION, default='')
+        comment = root_elem.findtext(cls._TAG_COMMENT)
 
         # Parse creator
-        creator_elem = root_elem.find('ltfs:creator', namespaces=cls.NS)
+        creator_elem = root_elem.find(cls._TAG_CREATOR)
         if creator_elem is not None:
             creator = creator_elem.text or 'unknown'
         else:
             creator = 'unknown'
 
-        # Parse directory tree
-        directory_elem = root_elem.find('ltfs:directory', namespaces=cls.NS)
-        if directory_elem is None:
+        if root_dir is None:
             raise ValueError("No root directory found in index")
 
-        root_dir = cls.parse_directory(directory_elem)
-
         return LTFSIndex(
             version=version,
             volume_uuid=volume_uuid,
@@ -205,28 +401,44 @@ class LTFSIndexParser:
             root=root_dir
         )
 
-    @classmethod
-    def get_all_files(cls, index: LTFSIndex) -> List[IndexFile]:
-        """Get flat list of all files in index."""
+    @staticmethod
+    def _collect(index: LTFSIndex) -> None:
+        """Flatten the directory tree into the index's file/directory caches."""
         files = []
+        directories = []
 
-        def collect_files(directory: IndexDirectory):
+        # Iterative pre-order walk; children are pushed in reverse so they
+        # are visited in document order
+        stack = [index.root]
+        while stack:
+            directory = stack.pop()
+            directories.append(directory)
             files.extend(directory.files)
-            for subdir in directory.subdirs:
-                collect_files(subdir)
+            stack.extend(reversed(directory.subdirs))
 
-        collect_files(index.root)
-        return files
+        index._all_files = files
+        index._all_dirs = directories
 
     @classmethod
-    def get_all_directories(cls, index: LTFSIndex) -> List[IndexDirectory]:
-        """Get flat list of all directories in index."""
-        directories = []
+    def get_all_files(cls, index: LTFSIndex) -> List[IndexFile]:
+        """
+        Get flat list of all files in index.
 
-        def collect_dirs(directory: IndexDirectory):
-            directories.append(directory)
-            for subdir in directory.subdirs:
-                collect_dirs(subdir)
+        The list is built on first use and cached on the index, so it must
+        not be modified by the caller.
+        """
+        if index._all_files is None:
+            cls._collect(index)
+        return index._all_files
 
-        collect_dirs(index.root)
-        return directories
+    @classmethod
+    def get_all_directories(cls, index: LTFSIndex) -> List[IndexDirectory]:
+        """
+        Get flat list of all directories in index.
+
+        The list is built on first use and cached on the index, so it must
+        not be modified by the caller.
+        """
+        if index._all_dirs is None:
+            cls._collect(index)
+        return index._all_dirs
@@ -5,6 +5,7 @@ MHL is an industry-standard XML format for storing file hashes,
 commonly used in film/TV production for verifying media transfers.
 """
 
+import functools
 import getpass
 import re
 import socket
@@ -12,13 +13,28 @@ import xml.etree.ElementTree as ET
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterator, Optional
-from xml.dom import minidom
+from typing import BinaryIO, Iterator, Optional, Union
+from xml.sax.saxutils import escape, quoteattr
 
-from .utils import normalize_path
+from .utils import DATACLASS_SLOTS, normalize_path
+
+try:
+    # Use lxml's C parser for loading when available; documents are still
+    # built with ElementTree so the serialized output doesn't change
+    from lxml.etree import iterparse as _iterparse_xml
+except ImportError:
+    _iterparse_xml = ET.iterparse
 
 __version__ = "0.1.0"
 
+_XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+
+# Pattern matches invalid XML 1.0 characters
+# Control chars 0x00-0x08, 0x0B, 0x0C, 0x0E-0x1F, and surrogates 0xD800-0xDFFF, 0xFFFE, 0xFFFF
+_INVALID_XML_CHARS = re.compile(
+    '[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f\ud800-\udfff\ufffe\uffff]'
+)
+
 
 def sanitize_xml_string(s: str) -> str:
     """
@@ -27,15 +43,70 @@ def sanitize_xml_string(s: str) -> str:
     XML 1.0 allows: #x9 | #xA | #xD | [#x20-#xD7FF] | [#xE000-#xFFFD] | [#x10000-#x10FFFF]
     This function removes any characters outside this range.
     """
-    # Pattern matches invalid XML 1.0 characters
-    # Control chars 0x00-0x08, 0x0B, 0x0C, 0x0E-0x1F, and surrogates 0xD800-0xDFFF, 0xFFFE, 0xFFFF
-    invalid_xml_chars = re.compile(
-        '[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f\ud800-\udfff\ufffe\uffff]'
-    )
-    return invalid_xml_chars.sub('', s)
+    return _INVALID_XML_CHARS.sub('', s)
+
+
+@functools.lru_cache(maxsize=65536)
+def _parse_mhl_date(date_str: Optional[str]) -> Optional[datetime]:
+    """Parse an MHL timestamp, or return None if missing or malformed."""
+    if not date_str:
+        return None
+    try:
+        # Slicing the fixed "YYYY-MM-DDTHH:MM:SSZ" layout is far cheaper than
+        # strptime; anything else goes through strptime for validation
+        if (
+            len(date_str) == 20
+            and date_str[4] == date_str[7] == "-"
+            and date_str[10] == "T"
+            and date_str[13] == date_str[16] == ":"
+            and date_str[19] == "Z"
+            and date_str[:4].isdigit()
+        ):
+            return datetime(
+                int(date_str[:4]),
+                int(date_str[5:7]),
+                int(date_str[8:10]),
+                int(date_str[11:13]),
+                int(date_str[14:16]),
+                int(date_str[17:19]),
+                tzinfo=timezone.utc,
+            )
+        return datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_wall_time(dt: datetime, tzinfo) -> str:
+    """
+    Format a datetime's wall-clock time in the MHL layout (cached).
+
+    tzinfo is passed only to be part of the cache key: aware datetimes for
+    the same instant compare equal even when their wall-clock times differ.
+    """
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
-@dataclass
+def _format_mhl_date(dt: datetime) -> str:
+    """
+    Format a timestamp the way MHL files record it.
+
+    Results are cached: transfer, recover and finalize stamp every entry of
+    a run with one hash date, and files copied together often share a
+    modification second. strftime is otherwise the most expensive part of
+    serializing a hash entry.
+    """
+    return _format_wall_time(dt, dt.tzinfo)
+
+
+def _child_xml(tag: str, text: str) -> str:
+    """Serialize a text-only child of a top-level element, as ElementTree would."""
+    if not text:
+        return f"\n        <{tag} />"
+    return f"\n        <{tag}>{escape(text)}</{tag}>"
+
+
+@dataclass(**DATACLASS_SLOTS)
 class HashEntry:
     """A single file hash entry in an MHL file."""
 
@@ -58,17 +129,42 @@ class HashEntry:
 
         if self.last_modification_date:
             mod_elem = ET.SubElement(hash_elem, "lastmodificationdate")
-            mod_elem.text = self.last_modification_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            mod_elem.text = _format_mhl_date(self.last_modification_date)
 
         xxhash_elem = ET.SubElement(hash_elem, "xxhash64be")
         xxhash_elem.text = self.xxhash64be
 
         if self.hash_date:
             hash_date_elem = ET.SubElement(hash_elem, "hashdate")
-            hash_date_elem.text = self.hash_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            hash_date_elem.text = _format_mhl_date(self.hash_date)
 
         return hash_elem
 
+    def to_xml_bytes(self) -> bytes:
+        """
+        Serialize as an indented top-level <hash> element.
+
+        Produces the same bytes as indenting to_element() one level and
+        serializing it with ElementTree, but without building the element
+        tree or running ElementTree's pure-Python serializer, which
+        dominate the cost of writing large MHL files.
+        """
+        parts = [
+            "<hash>",
+            # Normalize to NFC for cross-platform consistency
+            _child_xml("file", sanitize_xml_string(normalize_path(self.file))),
+            _child_xml("size", str(self.size)),
+        ]
+        if self.last_modification_date:
+            parts.append(
+                _child_xml("lastmodificationdate", _format_mhl_date(self.last_modification_date))
+            )
+        parts.append(_child_xml("xxhash64be", self.xxhash64be))
+        if self.hash_date:
+            parts.append(_child_xml("hashdate", _format_mhl_date(self.hash_date)))
+        parts.append("\n    </hash>")
+        return "".join(parts).encode("utf-8")
+
     @classmethod
     def from_element(cls, elem: ET.Element) -> "HashEntry":
         """Create from XML element."""
@@ -77,25 +173,8 @@ class HashEntry:
         size = int(elem.findtext("size", "0"))
         xxhash = elem.findtext("xxhash64be", "")
 
-        mod_date_str = elem.findtext("lastmodificationdate")
-        mod_date = None
-        if mod_date_str:
-            try:
-                mod_date = datetime.strptime(mod_date_str, "%Y-%m-%dT%H:%M:%SZ").replace(
-                    tzinfo=timezone.utc
-                )
-            except ValueError:
-                pass
-
-        hash_date_str = elem.findtext("hashdate")
-        hash_date = None
-        if hash_date_str:
-            try:
-                hash_date = datetime.strptime(hash_date_str, "%Y-%m-%dT%H:%M:%SZ").replace(
-                    tzinfo=timezone.utc
-                )
-            except ValueError:
-                pass
+        mod_date = _parse_mhl_date(elem.findtext("lastmodificationdate"))
+        hash_date = _parse_mhl_date(elem.findtext("hashdate"))
 
         return cls(
             file=file_path,
@@ -158,11 +237,11 @@ class CreatorInfo:
 
         if self.start_date:
             start_elem = ET.SubElement(creator, "startdate")
-            start_elem.text = self.start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            start_elem.text = _format_mhl_date(self.start_date)
 
         if self.finish_date:
             finish_elem = ET.SubElement(creator, "finishdate")
-            finish_elem.text = self.finish_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            finish_elem.text = _format_mhl_date(self.finish_date)
 
         return creator
 
@@ -174,24 +253,8 @@ class CreatorInfo:
         info.username = elem.findtext("username", "")
         info.hostname = elem.findtext("hostname", "")
         info.tool = elem.findtext("tool", "")
-
-        start_str = elem.findtext("startdate")
-        if start_str:
-            try:
-                info.start_date = datetime.strptime(start_str, "%Y-%m-%dT%H:%M:%SZ").replace(
-                    tzinfo=timezone.utc
-                )
-            except ValueError:
-                pass
-
-        finish_str = elem.findtext("finishdate")
-        if finish_str:
-            try:
-                info.finish_date = datetime.strptime(finish_str, "%Y-%m-%dT%H:%M:%SZ").replace(
-                    tzinfo=timezone.utc
-                )
-            except ValueError:
-                pass
+        info.start_date = _parse_mhl_date(elem.findtext("startdate"))
+        info.finish_date = _parse_mhl_date(elem.findtext("finishdate"))
 
         return info
 
@@ -261,66 +324,105 @@ class MHL:
         Returns:
             XML string
         """
-        root = ET.Element("hashlist", version=self.version)
+        return self.to_xml_bytes(pretty).decode("utf-8")
 
-        root.append(self.creator_info.to_element())
+    def to_xml_bytes(self, pretty: bool = True) -> bytes:
+        """
+        Convert to UTF-8 encoded XML.
 
-        if self.tape_info:
-            root.append(self.tape_info.to_element())
+        Serializes straight to bytes, skipping the separate encode pass
+        needed when writing the result of to_xml() to a file.
 
-        for hash_entry in self.hashes:
-            root.append(hash_entry.to_element())
+        Args:
+            pretty: If True, format with indentation
+
+        Returns:
+            UTF-8 encoded XML document
+        """
+        root = ET.Element("hashlist", version=self.version)
+        root.extend(self._elements())
 
         if pretty:
-            xml_str = ET.tostring(root, encoding="unicode")
-            try:
-                dom = minidom.parseString(xml_str)
-                return dom.toprettyxml(indent="    ", encoding=None)
-            except Exception as e:
-                # If pretty printing fails, try to identify the problematic entry
-                # by attempting to parse progressively larger subsets
-                import sys
-                print(f"Warning: XML pretty-print failed: {e}", file=sys.stderr)
-                print("Attempting to identify problematic entry...", file=sys.stderr)
-
-                # Try each hash entry individually to find the bad one
-                for i, entry in enumerate(self.hashes):
-                    test_root = ET.Element("test")
-                    test_root.append(entry.to_element())
-                    test_str = ET.tostring(test_root, encoding="unicode")
-                    try:
-                        minidom.parseString(test_str)
-                    except Exception:
-                        print(f"Problematic entry #{i}: {entry.file!r}", file=sys.stderr)
-
-                # Fall back to non-pretty output
-                return ET.tostring(root, encoding="unicode", xml_declaration=True)
+            # Indent in place rather than round-tripping through minidom,
+            # which re-parses the whole document into a much larger DOM
+            ET.indent(root, space="    ")
+            return _XML_DECLARATION + ET.tostring(root, encoding="utf-8") + b"\n"
         else:
-            return ET.tostring(root, encoding="unicode", xml_declaration=True)
+            return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+    def _elements(self) -> Iterator[ET.Element]:
+        """Yield the top-level elements of the hashlist in document order."""
+        yield self.creator_info.to_element()
+
+        if self.tape_info:
+            yield self.tape_info.to_element()
+
+        for hash_entry in self.hashes:
+            yield hash_entry.to_element()
 
     def save(self, filepath: Path) -> None:
-        """Save MHL to file."""
-        xml_content = self.to_xml(pretty=True)
-        filepath.write_text(xml_content, encoding="utf-8")
+        """
+        Save MHL to file.
+
+        Elements are serialized and written one at a time rather than built
+        into a single tree first, so memory use stays flat for large hash
+        lists. The output is identical to to_xml_bytes(pretty=True).
+        """
+        with MHLWriter(filepath, self.creator_info, self.tape_info, self.version) as writer:
+            for hash_entry in self.hashes:
+                writer.add_hash(hash_entry)
+
+    @staticmethod
+    def open_streaming(
+        filepath: Path,
+        creator_info: Optional[CreatorInfo] = None,
+        tape_info: Optional[TapeInfo] = None,
+        version: str = "1.1",
+    ) -> "MHLWriter":
+        """
+        Open an MHL file for writing hash entries as they are produced.
+
+        Unlike building an MHL and calling save(), entries are not kept in
+        memory. Use as a context manager::
+
+            with MHL.open_streaming(path, creator, tape) as writer:
+                writer.add_hash(entry)
+
+        Args:
+            filepath: Path of the MHL file to write
+            creator_info: Creator details (default: CreatorInfo.default())
+            tape_info: Optional tape details
+            version: MHL version attribute
+
+        Returns:
+            MHLWriter (the header is written on entering the context)
+        """
+        if creator_info is None:
+            creator_info = CreatorInfo.default()
+        return MHLWriter(filepath, creator_info, tape_info, version)
 
     @classmethod
     def load(cls, filepath: Path) -> "MHL":
-        """Load MHL from file."""
-        tree = ET.parse(filepath)
-        root = tree.getroot()
+        """
+        Load MHL from file.
 
+        The file is parsed incrementally and each element is discarded once
+        converted, so only the resulting entries are held in memory, not the
+        whole XML tree as well.
+        """
+        elements = _iterparse_top_level(filepath)
+        root = next(elements)
         mhl = cls(version=root.get("version", "1.1"))
+        creator_found = False
 
-        creator_elem = root.find("creatorinfo")
-        if creator_elem is not None:
-            mhl.creator_info = CreatorInfo.from_element(creator_elem)
-
-        tape_elem = root.find("tapeinfo")
-        if tape_elem is not None:
-            mhl.tape_info = TapeInfo.from_element(tape_elem)
-
-        for hash_elem in root.findall("hash"):
-            mhl.hashes.append(HashEntry.from_element(hash_elem))
+        for elem in elements:
+            if elem.tag == "hash":
+                mhl.hashes.append(HashEntry.from_element(elem))
+            elif elem.tag == "creatorinfo" and not creator_found:
+                mhl.creator_info = CreatorInfo.from_element(elem)
+                creator_found = True
+            elif elem.tag == "tapeinfo" and mhl.tape_info is None:
+                mhl.tape_info = TapeInfo.from_element(elem)
 
         return mhl
 
@@ -333,5 +435,111 @@ class MHL:
         return len(self.hashes)
 
 
+class MHLWriter:
+    """
+    Incremental MHL writer, created by MHL.open_streaming().
+
+    Each hash entry is serialized and written as soon as it is added. The
+    output is identical to MHL.save() for the same entries.
+    """
+
+    def __init__(
+        self,
+        filepath: Path,
+        creator_info: CreatorInfo,
+        tape_info: Optional[TapeInfo] = None,
+        version: str = "1.1",
+    ):
+        self.filepath = filepath
+        self.creator_info = creator_info
+        self.tape_info = tape_info
+        self.version = version
+        self.count = 0
+        self._file: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "MHLWriter":
+        self._file = open(self.filepath, "wb")
+        self._file.write(_XML_DECLARATION)
+        self._file.write(f"<hashlist version={quoteattr(self.version)}>".encode())
+        self._write_element(self.creator_info.to_element())
+        if self.tape_info:
+            self._write_element(self.tape_info.to_element())
+        return self
+
+    def add_hash(self, entry: HashEntry) -> None:
+        """Write a hash entry."""
+        self._file.write(b"\n    " + entry.to_xml_bytes())
+        self.count += 1
+
+    def _write_element(self, elem: ET.Element) -> None:
+        ET.indent(elem, space="    ", level=1)
+        self._file.write(b"\n    ")
+        self._file.write(ET.tostring(elem, encoding="utf-8"))
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            # Leave the document unterminated if writing failed part way
+            if exc_type is None:
+                self._file.write(b"\n</hashlist>\n")
+        finally:
+            self._file.close()
+            self._file = None
+
+
+def iterparse_mhl(filepath: Path) -> Iterator[Union[CreatorInfo, TapeInfo, HashEntry]]:
+    """
+    Stream the top-level entries of an MHL file.
+
+    Unlike MHL.load(), elements are discarded once they have been
+    converted, so memory use does not grow with the number of hashes.
+
+    Args:
+        filepath: Path to the MHL file
+
+    Yields:
+        CreatorInfo, TapeInfo and HashEntry objects in document order
+    """
+    elements = _iterparse_top_level(filepath)
+    next(elements)
+
+    for elem in elements:
+        if elem.tag == "hash":
+            yield HashEntry.from_element(elem)
+        elif elem.tag == "creatorinfo":
+            yield CreatorInfo.from_element(elem)
+        elif elem.tag == "tapeinfo":
+            yield TapeInfo.from_element(elem)
+
+
+def _iterparse_top_level(filepath: Path) -> Iterator[ET.Element]:
+    """
+    Parse an XML file incrementally, one top-level element at a time.
+
+    Yields the root element first (as soon as its start tag is read, so its
+    attributes but not its children are available), then each complete
+    child of the root. A child is removed from the tree once the caller
+    moves on to the next one.
+    """
+    root = None
+    depth = 0
+
+    for event, elem in _iterparse_xml(str(filepath), events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+                yield root
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1:
+            continue
+
+        yield elem
+
+        # Drop converted children from the root so the tree stays small
+        root.clear()
+
+
 # Need this import for CreatorInfo.default()
 import os
@@ -2,12 +2,19 @@
 LTFS mount and unmount operations.
 """
 
+import os
+import platform
+import re
 import subprocess
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict, Any
 
-from .config import Config, get_config
+from .config import Config, get_config, is_mount_point
+from .ltfs_index import LTFSIndexParser
+from .utils import iter_files
 
 
 class MountError(Exception):
@@ -108,14 +115,7 @@ def mount(
     # Wait for mount and verify with retry
     # LTFS may fork to background and take a few seconds to complete FUSE setup
     max_wait = 30  # seconds
-    check_interval = 0.5
-    waited = 0
-    while waited < max_wait:
-        time.sleep(check_interval)
-        waited += check_interval
-        if _verify_mount(mount_point):
-            break
-    else:
+    if not _wait_for_mount_state(mount_point, True, max_wait):
         raise MountError(
             "Mount command succeeded but mount point is not accessible after "
             f"{max_wait} seconds. Check LTFS logs for errors."
@@ -150,7 +150,7 @@ def unmount(
         return  # Already unmounted, nothing to do
 
     # Sync filesystem
-    subprocess.run(["sync"], check=False)
+    os.sync()
 
     # Unmount
     if config.platform.name == "macos":
@@ -185,8 +185,7 @@ def unmount(
         )
 
     # Verify unmount
-    time.sleep(2)
-    if _verify_mount(mount_point):
+    if not _wait_for_mount_state(mount_point, False, timeout=10):
         raise MountError("Unmount command succeeded but mount point is still mounted")
 
 
@@ -264,16 +263,48 @@ def format_tape(
 
 def _verify_mount(mount_point: Path) -> bool:
     """Check if mount point is actually mounted."""
-    if not mount_point.exists():
-        return False
+    return is_mount_point(mount_point)
 
-    try:
-        # Check if it's a mount point by comparing device IDs
-        mount_stat = mount_point.stat()
-        parent_stat = mount_point.parent.stat()
-        return mount_stat.st_dev != parent_stat.st_dev
-    except OSError:
-        return False
+
+def _wait_for_mount_state(mount_point: Path, mounted: bool, timeout: float) -> bool:
+    """
+    Poll until the mount point is (or is no longer) mounted.
+
+    Checks immediately, then backs off from 50 ms up to 2 s between checks,
+    so a fast mount/unmount returns almost at once while a slow tape load
+    isn't polled needlessly often.
+
+    Returns:
+        True if the mount point reached the requested state within timeout
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while True:
+        if _verify_mount(mount_point) == mounted:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 1.5, 2.0)
+
+
+# LTFS volume attributes reported by get_tape_attributes()
+_TAPE_ATTRIBUTES = (
+    "volumeName",
+    "volumeUUID",
+    "vendor",
+    "version",
+    "generation",
+    "formatTime",
+    "updateTime",
+    "softwareProduct",
+    "softwareVendor",
+    "softwareVersion",
+    "softwareFormatSpec",
+    "barcode",
+    "mediaPool",
+)
 
 
 def get_tape_attributes(mount_point: Path) -> Dict[str, Any]:
@@ -282,8 +313,6 @@ def get_tape_attributes(mount_point: Path) -> Dict[str, Any]:
 
     Returns dictionary with tape metadata like volume name, barcode, etc.
     """
-    import platform
-
     # Extended attribute prefix depends on platform
     if platform.system().lower() == "linux":
         prefix = "user.ltfs."
@@ -292,62 +321,192 @@ def get_tape_attributes(mount_point: Path) -> Dict[str, Any]:
 
     attributes = {}
 
-    # Try to read LTFS extended attributes
     try:
-        # Try using xattr module if available
-        try:
+        if hasattr(os, "listxattr"):
+            # Linux: call the syscalls directly
+            listxattr, getxattr = os.listxattr, os.getxattr
+        else:
             import xattr
 
-            # Common LTFS attributes
-            attr_names = [
-                "volumeName",
-                "volumeUUID",
-                "vendor",
-                "version",
-                "generation",
-                "formatTime",
-                "updateTime",
-                "softwareProduct",
-                "softwareVendor",
-                "softwareVersion",
-                "softwareFormatSpec",
-                "barcode",
-                "mediaPool",
-            ]
-
-            for attr in attr_names:
-                try:
-                    value = xattr.getxattr(str(mount_point), prefix + attr)
-                    if isinstance(value, bytes):
-                        value = value.decode('utf-8', errors='ignore').strip('\x00')
-                    attributes[attr] = value
-                except (OSError, KeyError):
-                    pass
+            listxattr, getxattr = xattr.listxattr, xattr.getxattr
+    except ImportError:
+        return attributes
 
-        except ImportError:
-            # Fall back to using getfattr command on Linux
-            if platform.system().lower() == "linux":
-                result = subprocess.run(
-                    ["getfattr", "-d", "-m", "user.ltfs", str(mount_point)],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
+    path = str(mount_point)
+    names = [prefix + attr for attr in _TAPE_ATTRIBUTES]
 
-                if result.returncode == 0:
-                    # Parse getfattr output
-                    for line in result.stdout.splitlines():
-                        if "=" in line and line.startswith("user.ltfs."):
-                            key, value = line.split("=", 1)
-                            key = key.replace("user.ltfs.", "").strip()
-                            value = value.strip().strip('"')
-                            attributes[key] = value
-    except Exception:
-        pass
+    # One listxattr call tells us which attributes exist, so we don't pay a
+    # failing getxattr for each missing one. LTFS may leave its virtual
+    # attributes out of the listing, in which case probe every name.
+    try:
+        present = set(listxattr(path))
+    except OSError:
+        present = set()
+    names = [name for name in names if name in present] or names
+
+    for name in names:
+        try:
+            value = getxattr(path, name)
+        except (OSError, KeyError):
+            continue
+        if isinstance(value, bytes):
+            value = value.decode('utf-8', errors='ignore').strip('\x00')
+        attributes[name[len(prefix):]] = value
 
     return attributes
 
 
+def get_start_block(path: Path) -> Optional[int]:
+    """
+    Get the LTFS start block of a file on a mounted tape.
+
+    LTFS exposes the position of a file's first extent as the
+    ``startblock`` extended attribute.
+
+    Returns:
+        Start block number, or None if not available
+    """
+    if platform.system().lower() == "linux":
+        name = "user.ltfs.startblock"
+    else:  # macOS/Darwin
+        name = "ltfs.startblock"
+
+    try:
+        if hasattr(os, "getxattr"):
+            value = os.getxattr(path, name)
+        else:
+            import xattr
+
+            value = xattr.getxattr(str(path), name)
+        return int(value.decode("ascii", errors="ignore").strip("\x00"))
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def tape_order_key(path: Path) -> int:
+    """
+    Sort key that orders files on a mounted tape by physical position.
+
+    Files without a start block sort last, keeping their relative order.
+    """
+    block = get_start_block(path)
+    return block if block is not None else sys.maxsize
+
+
+# Indexes saved via capture_index are named <volume UUID>-<generation>-<partition>.xml
+_CAPTURED_INDEX_NAME = re.compile(r"(?P<uuid>.+)-(?P<generation>\d+)-[ab]\.xml")
+
+
+def _index_total_size(config: Config, tape_attrs: Dict[str, Any]) -> Optional[int]:
+    """
+    Total file size from the captured index of the mounted tape.
+
+    Returns None unless an index for the tape's volume UUID exists and its
+    generation matches the one reported by the mounted tape, so stale
+    indexes are never used.
+    """
+    volume_uuid = tape_attrs.get("volumeUUID")
+    if not volume_uuid:
+        return None
+
+    try:
+        generation = int(tape_attrs.get("generation", ""))
+    except ValueError:
+        return None
+
+    try:
+        index_files = list(config.index_dir.glob(f"{volume_uuid}-*.xml"))
+    except OSError:
+        return None
+
+    for index_file in index_files:
+        match = _CAPTURED_INDEX_NAME.fullmatch(index_file.name)
+        if (
+            match
+            and match.group("uuid") == volume_uuid
+            and int(match.group("generation")) == generation
+        ):
+            try:
+                index = LTFSIndexParser.parse(index_file)
+            except Exception:
+                # Unreadable or truncated index; try another or fall back to statvfs
+                continue
+            return sum(file.size for file in LTFSIndexParser.get_all_files(index))
+
+    return None
+
+
+def _scan_tree(root: Path) -> tuple[int, int, int]:
+    """
+    Count files, directories and total file size under a directory.
+
+    Entries carry the file type from the directory listing (see
+    iter_files), so only regular files need a stat() (for their size). On
+    tape every avoided metadata call matters.
+
+    Returns:
+        Tuple of (file_count, dir_count, total_size)
+    """
+    file_count = 0
+    dir_count = 0
+    total_size = 0
+
+    for entry, _ in iter_files(root, include_dirs=True):
+        try:
+            if entry.is_dir():
+                dir_count += 1
+                continue
+        except OSError:
+            # Skip entries we can't access
+            continue
+
+        file_count += 1
+        try:
+            total_size += entry.stat().st_size
+        except OSError:
+            pass
+
+    return file_count, dir_count, total_size
+
+
+def _used_space(path: Path) -> int:
+    """
+    Space used on the filesystem containing path, in bytes, or 0.
+
+    A single statvfs call, so unlike du it doesn't walk the tape. The figure
+    includes LTFS's own overhead, so it only approximates the file total.
+    """
+    try:
+        st = os.statvfs(path)
+    except OSError:
+        return 0
+    return (st.f_blocks - st.f_bfree) * st.f_frsize
+
+
+def _list_top_level(path: Path) -> tuple[list[str], list[str]]:
+    """
+    Names of the directories and files directly inside a directory.
+
+    Entry types come from the directory listing itself, so unlike
+    Path.is_dir()/is_file() this doesn't stat each entry.
+    """
+    dirs = []
+    files = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        dirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return dirs, files
+
+
 def get_tape_info(mount_point: Optional[Path] = None, config: Optional[Config] = None, deep_scan: bool = False) -> dict:
     """
     Get information about a mounted tape.
@@ -368,72 +527,43 @@ def get_tape_info(mount_point: Optional[Path] = None, config: Optional[Config] =
     if not _verify_mount(mount_point):
         return {"mounted": False}
 
-    # Get tape attributes from extended attributes
-    tape_attrs = get_tape_attributes(mount_point)
-
-    if deep_scan:
-        # Slow but accurate - count all files recursively
-        file_count = 0
-        dir_count = 0
-        total_size = 0
-
-        for item in mount_point.rglob("*"):
-            try:
-                if item.is_file():
-                    file_count += 1
-                    try:
-                        total_size += item.stat().st_size
-                    except OSError:
-                        pass
-                elif item.is_dir():
-                    dir_count += 1
-            except (OSError, PermissionError):
-                # Skip files/dirs we can't access
-                pass
-
-        return {
-            "mounted": True,
-            "mount_point": str(mount_point),
-            "file_count": file_count,
-            "dir_count": dir_count,
-            "total_size": total_size,
-            **tape_attrs,
-        }
-    else:
-        # Fast but approximate - use du command and list top-level only
-        import shutil
-
-        # Get disk usage using du (much faster than Python recursion)
-        total_size = 0
-        try:
-            result = subprocess.run(
-                ["du", "-sb", str(mount_point)],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-            if result.returncode == 0:
-                total_size = int(result.stdout.split()[0])
-        except (subprocess.TimeoutExpired, ValueError, IndexError):
-            pass
-
-        # Count top-level items only
-        top_level_dirs = []
-        top_level_files = []
-        try:
-            for item in mount_point.iterdir():
-                if item.is_dir():
-                    top_level_dirs.append(item.name)
-                elif item.is_file():
-                    top_level_files.append(item.name)
-        except (OSError, PermissionError):
-            pass
-
-        return {
-            "mounted": True,
-            "mount_point": str(mount_point),
-            "total_size": total_size,
-            "top_level_dirs": top_level_dirs,
-            "top_level_files": top_level_files,
-            **tape_attrs,
-        }
+    # The xattr reads, the directory walk/listing and the size lookup are
+    # independent, so run them side by side instead of paying each latency
+    # in turn
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        attrs_future = pool.submit(get_tape_attributes, mount_point)
+
+        if deep_scan:
+            # Slow but accurate - count all files recursively
+            file_count, dir_count, total_size = _scan_tree(mount_point)
+            tape_attrs = attrs_future.result()
+
+            return {
+                "mounted": True,
+                "mount_point": str(mount_point),
+                "file_count": file_count,
+                "dir_count": dir_count,
+                "total_size": total_size,
+                **tape_attrs,
+            }
+
+        # Fast but approximate - count top-level items only
+        listing_future = pool.submit(_list_top_level, mount_point)
+
+        # Take the size from the tape's own index when we've captured the
+        # current one, otherwise approximate it from the space in use
+        tape_attrs = attrs_future.result()
+        total_size = _index_total_size(config, tape_attrs)
+        if total_size is None:
+            total_size = _used_space(mount_point)
+
+        top_level_dirs, top_level_files = listing_future.result()
+
+    return {
+        "mounted": True,
+        "mount_point": str(mount_point),
+        "total_size": total_size,
+        "top_level_dirs": top_level_dirs,
+        "top_level_files": top_level_files,
+        **tape_attrs,
+    }
@@ -2,13 +2,24 @@
 File transfer operations with verification.
 """
 
+import fnmatch
+import functools
+import os
+import re
+import shutil
 import subprocess
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Iterable, Iterator, Optional
 
-from .utils import normalize_path
+import xxhash
+
+from .utils import iter_files, normalize_path
 
 from rich.console import Console
 from rich.progress import (
@@ -24,11 +35,31 @@ from rich.progress import (
 )
 
 from .config import Config, get_config
-from .hash import hash_file
+from .hash import drop_page_cache, hash_file, hash_file_pipelined
 from .mhl import MHL, CreatorInfo, HashEntry, TapeInfo
 
 console = Console()
 
+# Threads used to hash source files in Phase 1
+HASH_WORKERS = min(os.cpu_count() or 1, 8)
+
+# Phase 1 hash jobs queued per worker, so huge sources don't submit every file up front
+HASH_QUEUE_DEPTH = 4
+
+# Buffer size for the single-pass copy in Phase 2
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Minimum seconds between rsync progress lines shown on the console
+RSYNC_CONSOLE_INTERVAL = 0.1
+
+# Minimum seconds between updates of the current file shown in progress bars
+DESCRIPTION_INTERVAL = 0.1
+
+
+def _mb_per_second(num_bytes: int, seconds: float) -> float:
+    """Throughput in MB/s, or 0 if no time was measured."""
+    return num_bytes / (1024 * 1024) / seconds if seconds > 0 else 0
+
 
 @dataclass
 class TransferResult:
@@ -53,8 +84,8 @@ class TransferResult:
     phase1_duration: float = 0.0  # Hash source
     phase2_duration: float = 0.0  # Transfer
     phase3_duration: float = 0.0  # Verify
-    phase4_duration: float = 0.0  # MHL generation
-    phase5_duration: float = 0.0  # Catalog update
+    phase4_duration: float = 0.0  # MHL generation + catalog files
+    phase5_duration: float = 0.0  # Catalog database update
 
     @property
     def duration_seconds(self) -> float:
@@ -67,20 +98,76 @@ class TransferResult:
     @property
     def phase1_throughput(self) -> float:
         """Phase 1 throughput in MB/s."""
-        total_mb = self.bytes_total / (1024 * 1024)
-        return total_mb / self.phase1_duration if self.phase1_duration > 0 else 0
+        return _mb_per_second(self.bytes_total, self.phase1_duration)
 
     @property
     def phase2_throughput(self) -> float:
         """Phase 2 throughput in MB/s."""
-        total_mb = self.bytes_total / (1024 * 1024)
-        return total_mb / self.phase2_duration if self.phase2_duration > 0 else 0
+        return _mb_per_second(self.bytes_total, self.phase2_duration)
 
     @property
     def phase3_throughput(self) -> float:
         """Phase 3 throughput in MB/s."""
-        total_mb = self.bytes_total / (1024 * 1024)
-        return total_mb / self.phase3_duration if self.phase3_duration > 0 else 0
+        return _mb_per_second(self.bytes_total, self.phase3_duration)
+
+    @property
+    def overall_throughput(self) -> float:
+        """Throughput of the whole transfer in MB/s."""
+        return _mb_per_second(self.bytes_total, self.duration_seconds)
+
+
+class SourceHashes:
+    """
+    Hashes and sizes of transferred files, keyed by normalized relative path.
+
+    Stored as parallel columns in insertion order: the hashes and sizes are
+    packed arrays rather than a (hex string, int) tuple per file, which is
+    several times smaller for archives with millions of files. Hashes are
+    kept as 64-bit integers and converted back to hex when read.
+    """
+
+    __slots__ = ("paths", "hashes", "sizes", "_index")
+
+    def __init__(self):
+        self.paths: list[str] = []
+        self.hashes = array("Q")  # uint64 XXH64 values
+        self.sizes = array("q")  # int64 byte counts
+        self._index: dict[str, int] = {}
+
+    def add(self, path: str, file_hash: str, size: int) -> None:
+        """Record a file's hex hash and size (replacing any earlier entry)."""
+        row = self._index.get(path)
+        if row is None:
+            self._index[path] = len(self.paths)
+            self.paths.append(path)
+            self.hashes.append(int(file_hash, 16))
+            self.sizes.append(size)
+        else:
+            self.hashes[row] = int(file_hash, 16)
+            self.sizes[row] = size
+
+    def __getitem__(self, path: str) -> tuple[str, int]:
+        """Return (hex hash, size) for a path."""
+        row = self._index[path]
+        return f"{self.hashes[row]:016x}", self.sizes[row]
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._index
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def items(self) -> Iterator[tuple[str, tuple[str, int]]]:
+        """Yield (path, (hex hash, size)) in insertion order."""
+        for path, file_hash, size in zip(self.paths, self.hashes, self.sizes):
+            yield path, (f"{file_hash:016x}", size)
+
+    def total_size(self) -> int:
+        """Total size of all files in bytes."""
+        return sum(self.sizes)
 
 
 class TransferError(Exception):
@@ -92,9 +179,13 @@ class TransferError(Exception):
 def find_long_filenames(source: Path, max_length: int = 250) -> list[Path]:
     """Find files with names exceeding max_length bytes."""
     long_names = []
-    for path in source.rglob("*"):
-        if path.is_file() and len(path.name.encode("utf-8")) > max_length:
-            long_names.append(path)
+    # Only names are needed, so os.walk's plain name lists are enough
+    for dirpath, _, filenames in os.walk(source):
+        for name in filenames:
+            # For ASCII names the length in bytes is just len(); avoid encoding
+            length = len(name) if name.isascii() else len(name.encode("utf-8"))
+            if length > max_length:
+                long_names.append(Path(dirpath, name))
     return long_names
 
 
@@ -108,15 +199,248 @@ def check_source(source: Path) -> tuple[int, int]:
     file_count = 0
     total_size = 0
 
-    for path in source.rglob("*"):
-        if path.is_file():
-            file_count += 1
+    for entry, _ in iter_files(source):
+        file_count += 1
+        try:
+            total_size += entry.stat().st_size
+        except OSError:
+            pass
+
+    return file_count, total_size
+
+
+def _progress_columns() -> tuple:
+    """Columns for the byte-based Phase 1-3 progress bars."""
+    return (
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        TextColumn("•"),
+        DownloadColumn(),
+        TextColumn("•"),
+        TransferSpeedColumn(),
+        TimeElapsedColumn(),
+    )
+
+
+def _collect_source_files(
+    source: Path, excludes: list[str]
+) -> tuple[list[tuple[Path, Path, int]], list[str]]:
+    """
+    Walk the source and split it into files to transfer and excluded files.
+
+    Returns:
+        Tuple of ([(path, rel_path, size), ...] in walk order, excluded rel paths)
+    """
+    source_files: list[tuple[Path, Path, int]] = []
+    excluded_files: list[str] = []
+    is_excluded = _compile_excludes(tuple(excludes)).matches
+
+    for entry, rel_str in iter_files(source):
+        # Skip excluded files
+        if is_excluded(rel_str):
+            excluded_files.append(rel_str)
+            continue
+
+        rel_path = Path(rel_str)
+        try:
+            source_files.append((Path(entry.path), rel_path, entry.stat().st_size))
+        except OSError as e:
+            console.print(f"[yellow]Warning:[/yellow] Could not stat {rel_path}: {e}")
+
+    return source_files, excluded_files
+
+
+def _hash_source_files(
+    source_files: list[tuple[Path, Path, int]],
+    source_hashes: SourceHashes,
+    bytes_total: int,
+) -> None:
+    """Phase 1: hash source files concurrently into source_hashes (walk order)."""
+    with Progress(*_progress_columns(), console=console) as progress:
+        task = progress.add_task("Hashing", total=bytes_total)
+
+        # xxhash and file reads release the GIL, so a thread pool scales
+        # across cores without the pickling cost of worker processes
+        hashes: list[Optional[str]] = [None] * len(source_files)
+        bytes_processed = 0
+        last_description = 0.0
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            jobs = enumerate(source_files)
+            pending = {}
+
+            def submit(count: int) -> None:
+                for i, (path, _, _) in islice(jobs, count):
+                    # Drop each file from the page cache once hashed, so Phase 2
+                    # reads the source from disk rather than from cache
+                    pending[pool.submit(hash_file, path, drop_cache=True)] = i
+
+            submit(HASH_WORKERS * HASH_QUEUE_DEPTH)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                # Top up the queue before handling results so workers stay busy
+                submit(len(done))
+                for future in done:
+                    i = pending.pop(future)
+                    _, rel_path, file_size = source_files[i]
+                    try:
+                        hashes[i] = future.result()
+                    except OSError as e:
+                        console.print(f"[yellow]Warning:[/yellow] Could not hash {rel_path}: {e}")
+                        continue
+
+                    bytes_processed += file_size
+                    progress.update(task, completed=bytes_processed)
+
+                    # Update description with the most recently finished file, but
+                    # not for every file: each new description is re-rendered
+                    now = time.monotonic()
+                    if now - last_description >= DESCRIPTION_INTERVAL:
+                        progress.update(task, description=f"Hashing: {str(rel_path)[:60]}")
+                        last_description = now
+
+        # Fill in walk order (not completion order) so MHL output is stable
+        for (_, rel_path, file_size), file_hash in zip(source_files, hashes):
+            if file_hash is not None:
+                # Normalize path for consistent comparison with LTFS (which uses NFC)
+                # Store size alongside hash to avoid re-reading filesystem with wrong normalization
+                source_hashes.add(normalize_path(str(rel_path)), file_hash, file_size)
+
+
+def _copy_and_hash(src: Path, dst: Path, bufsize: int = COPY_BUFFER_SIZE) -> tuple[str, int]:
+    """
+    Copy a file while computing its XXHash64.
+
+    The data is read once into a reused buffer, which is both hashed and
+    written out, so the source never has to be read a second time.
+
+    Returns:
+        Tuple of (hex hash, bytes copied)
+    """
+    hasher = xxhash.xxh64()
+    buf = bytearray(bufsize)
+    view = memoryview(buf)
+    total = 0
+
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+        while n := fsrc.readinto(buf):
+            chunk = view[:n]
+            hasher.update(chunk)
+            # Unbuffered writes may be short
+            while chunk:
+                chunk = chunk[fdst.write(chunk):]
+            total += n
+
+    return hasher.hexdigest(), total
+
+
+def _copy_source_files(
+    source_files: list[tuple[Path, Path, int]],
+    destination: Path,
+    source_hashes: SourceHashes,
+    bytes_total: int,
+    log_file,
+) -> None:
+    """Phase 2 (single pass): copy and hash source files into source_hashes."""
+    with Progress(*_progress_columns(), console=console) as progress:
+        task = progress.add_task("Copying", total=bytes_total)
+        bytes_copied = 0
+        # Directories already created, so files sharing one only mkdir once
+        made_dirs: set[Path] = set()
+        last_description = 0.0
+
+        for path, rel_path, file_size in source_files:
+            now = time.monotonic()
+            if now - last_description >= DESCRIPTION_INTERVAL:
+                progress.update(task, description=f"Copying: {str(rel_path)[:60]}")
+                last_description = now
+            dest_path = destination / rel_path
+
+            try:
+                if dest_path.parent not in made_dirs:
+                    dest_path.parent.mkdir(parents=True, exist_ok=True)
+                    made_dirs.add(dest_path.parent)
+                file_hash, copied = _copy_and_hash(path, dest_path)
+            except OSError as e:
+                console.print(f"[yellow]Warning:[/yellow] Could not copy {rel_path}: {e}")
+                log_file.write(f"FAILED {rel_path}: {e}\n")
+                continue
+
+            # Preserve timestamps and permissions like rsync -a
             try:
-                total_size += path.stat().st_size
+                shutil.copystat(path, dest_path)
             except OSError:
                 pass
 
-    return file_count, total_size
+            # Store the size actually copied, which is what the hash covers
+            source_hashes.add(normalize_path(str(rel_path)), file_hash, copied)
+            log_file.write(f"{rel_path}\n")
+
+            bytes_copied += file_size
+            progress.update(task, completed=bytes_copied)
+
+
+def _run_rsync(rsync_cmd: list[str], log_file) -> None:
+    """
+    Phase 2: run rsync, teeing its output to the log and the console.
+
+    Output is read in large chunks and every line goes to the log, but the
+    console only gets the latest line at most every RSYNC_CONSOLE_INTERVAL
+    seconds (plus any rsync error messages), since rendering each of the
+    many progress lines through Rich costs more CPU than the copy itself.
+    """
+    # Use binary mode to handle non-UTF-8 filenames gracefully
+    process = subprocess.Popen(
+        rsync_cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+
+    fd = process.stdout.fileno()
+    pending = bytearray()
+    latest: Optional[str] = None
+    last_print = 0.0
+
+    while True:
+        chunk = os.read(fd, 65536)
+        if chunk:
+            pending += chunk
+            # Only decode complete lines, so multi-byte characters aren't split
+            end = pending.rfind(b"\n") + 1
+            if not end:
+                continue
+        else:
+            # EOF: flush whatever is left, even without a trailing newline
+            end = len(pending)
+            if not end:
+                break
+
+        # Decode with error handling for non-UTF-8 filenames
+        text = pending[:end].decode("utf-8", errors="replace")
+        del pending[:end]
+        log_file.write(text)
+
+        for line in text.splitlines():
+            if line.startswith("rsync"):
+                # Errors and warnings ("rsync: ...", "rsync error: ...")
+                console.print(line.rstrip())
+            elif line.strip():
+                latest = line
+
+        now = time.monotonic()
+        if latest is not None and (not chunk or now - last_print >= RSYNC_CONSOLE_INTERVAL):
+            console.print(latest.rstrip())
+            latest = None
+            last_print = now
+
+        if not chunk:
+            break
+
+    process.wait()
+
+    if process.returncode != 0:
+        console.print(f"[yellow]Warning:[/yellow] rsync returned {process.returncode}")
 
 
 def transfer(
@@ -126,6 +450,7 @@ def transfer(
     verify: bool = True,
     config: Optional[Config] = None,
     progress_callback: Optional[Callable[[str, int, int], None]] = None,
+    single_pass: bool = False,
 ) -> TransferResult:
     """
     Transfer files to an LTFS tape with verification.
@@ -137,6 +462,9 @@ def transfer(
         verify: If True, verify hashes after transfer
         config: Configuration to use
         progress_callback: Optional callback(phase, current, total)
+        single_pass: If True, hash source files while copying them in Python
+            instead of hashing them first and copying with rsync, so each
+            source file is read once
 
     Returns:
         TransferResult with details of the operation
@@ -177,77 +505,34 @@ def transfer(
         result.end_time = datetime.now(timezone.utc)
         return result
 
-    # Phase 1: Hash source files
-    console.print("[bold blue]Phase 1:[/bold blue] Hashing source files...")
-    phase1_start = datetime.now(timezone.utc)
     # Store hash and file size together to avoid filesystem lookup issues with Unicode normalization
     # Key: normalized path (NFC), Value: (hash, file_size)
-    source_hashes: dict[str, tuple[str, int]] = {}
-    excluded_files: list[str] = []
+    source_hashes = SourceHashes()
+    source_files, excluded_files = _collect_source_files(source, config.excludes)
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        TextColumn("•"),
-        DownloadColumn(),
-        TextColumn("•"),
-        TransferSpeedColumn(),
-        TimeElapsedColumn(),
-        console=console,
-    ) as progress:
-        task = progress.add_task("Hashing", total=result.bytes_total)
-
-        bytes_processed = 0
-        for path in source.rglob("*"):
-            if path.is_file():
-                rel_path = path.relative_to(source)
-
-                # Skip excluded files
-                if _should_exclude(rel_path, config.excludes):
-                    excluded_files.append(str(rel_path))
-                    continue
-
-                try:
-                    file_size = path.stat().st_size
-                    # Update description with current file
-                    progress.update(task, description=f"Hashing: {str(rel_path)[:60]}")
-
-                    file_hash = hash_file(path)
-                    # Normalize path for consistent comparison with LTFS (which uses NFC)
-                    # Store size alongside hash to avoid re-reading filesystem with wrong normalization
-                    source_hashes[normalize_path(str(rel_path))] = (file_hash, file_size)
-
-                    bytes_processed += file_size
-                    progress.update(task, completed=bytes_processed)
-                except OSError as e:
-                    console.print(f"[yellow]Warning:[/yellow] Could not hash {rel_path}: {e}")
+    # Phase 1: Hash source files
+    phase1_start = datetime.now(timezone.utc)
+    if single_pass:
+        # Source files are hashed as they are copied in Phase 2
+        console.print("[dim]Phase 1 skipped: hashing during transfer[/dim]")
+    else:
+        console.print("[bold blue]Phase 1:[/bold blue] Hashing source files...")
+        _hash_source_files(source_files, source_hashes, result.bytes_total)
 
     # Report excluded files
     if excluded_files:
         console.print(f"[dim]Excluded {len(excluded_files)} files matching exclusion patterns[/dim]")
 
     phase1_end = datetime.now(timezone.utc)
-    phase1_duration = (phase1_end - phase1_start).total_seconds()
+    phase1_duration = (phase1_end - phase1_start).total_seconds() if not single_pass else 0.0
 
     # Phase 2: Transfer files with rsync
-    # Drop page cache to get accurate transfer timing (source files were just hashed)
-    # Only on Linux - macOS doesn't support vm.drop_caches
-    if config.platform.name == "linux":
-        console.print("[dim]Clearing page cache before transfer...[/dim]")
-        try:
-            subprocess.run(["sync"], check=False)
-            subprocess.run(
-                ["sudo", "-n", "sysctl", "-w", "vm.drop_caches=3"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=False,
-            )
-        except Exception:
-            pass  # Silently continue if cache clearing fails
-
-    console.print("[bold blue]Phase 2:[/bold blue] Transferring files...")
+    # (Phase 1 dropped each source file from the page cache once hashed, so
+    # rsync reads from disk and the transfer timing is accurate)
+    if single_pass:
+        console.print("[bold blue]Phase 2:[/bold blue] Transferring and hashing files...")
+    else:
+        console.print("[bold blue]Phase 2:[/bold blue] Transferring files...")
     phase2_start = datetime.now(timezone.utc)
 
     exclude_args = []
@@ -283,43 +568,38 @@ def transfer(
             log_file.write(f"Tape: {tape_name}\n")
             log_file.write(f"Started: {start_time.isoformat()}\n")
             log_file.write(f"Files counted: {result.files_total}\n")
-            log_file.write(f"Files to transfer: {len(source_hashes)}\n")
+            log_file.write(
+                f"Files to transfer: {len(source_files) if single_pass else len(source_hashes)}\n"
+            )
             if excluded_files:
                 log_file.write(f"Files excluded: {len(excluded_files)}\n")
                 log_file.write(f"\n--- Excluded files ---\n")
                 for excluded in excluded_files:
                     log_file.write(f"  {excluded}\n")
             log_file.write(f"\n--- Phase 1 (Hash source) ---\n")
-            log_file.write(f"Started: {phase1_start.isoformat()}\n")
-            log_file.write(f"Finished: {phase1_end.isoformat()}\n")
-            log_file.write(f"Duration: {phase1_duration:.2f}s\n")
-            total_mb = result.bytes_total / (1024 * 1024)
-            log_file.write(f"Throughput: {total_mb / phase1_duration:.1f} MB/s\n")
+            if single_pass:
+                log_file.write("Skipped (source hashed during transfer)\n")
+            else:
+                log_file.write(f"Started: {phase1_start.isoformat()}\n")
+                log_file.write(f"Finished: {phase1_end.isoformat()}\n")
+                log_file.write(f"Duration: {phase1_duration:.2f}s\n")
+                log_file.write(
+                    f"Throughput: {_mb_per_second(result.bytes_total, phase1_duration):.1f} MB/s\n"
+                )
             log_file.write(f"\n--- Phase 2 (Transfer) ---\n")
             log_file.write(f"Started: {phase2_start.isoformat()}\n")
-            log_file.write(f"\n--- rsync output ---\n")
-            log_file.flush()
-
-            # Run rsync and tee output to both console and log
-            # Use binary mode to handle non-UTF-8 filenames gracefully
-            process = subprocess.Popen(
-                rsync_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                bufsize=1,
-            )
-
-            # Stream output line by line, handling encoding errors
-            for raw_line in process.stdout:
-                # Decode with error handling for non-UTF-8 filenames
-                line = raw_line.decode("utf-8", errors="replace")
-                console.print(line.rstrip())
-                log_file.write(line)
 
-            process.wait()
-
-            if process.returncode != 0:
-                console.print(f"[yellow]Warning:[/yellow] rsync returned {process.returncode}")
+            if single_pass:
+                log_file.write("\n--- Copied files ---\n")
+                _copy_source_files(
+                    source_files, result.destination, source_hashes, result.bytes_total, log_file
+                )
+                log_file.write(f"Files copied: {len(source_hashes)}\n")
+                log_file.write(f"Files failed: {len(source_files) - len(source_hashes)}\n")
+            else:
+                log_file.write("\n--- rsync output ---\n")
+                log_file.flush()
+                _run_rsync(rsync_cmd, log_file)
 
         result.log_path = log_path
 
@@ -334,98 +614,80 @@ def transfer(
         f.write(f"\n--- Phase 2 completed ---\n")
         f.write(f"Finished: {phase2_end.isoformat()}\n")
         f.write(f"Duration: {phase2_duration:.2f}s\n")
-        total_mb = result.bytes_total / (1024 * 1024)
-        f.write(f"Throughput: {total_mb / phase2_duration:.1f} MB/s\n")
+        f.write(f"Throughput: {_mb_per_second(result.bytes_total, phase2_duration):.1f} MB/s\n")
 
     # Phase 3: Verify destination hashes
     if verify:
-        # Drop page cache to ensure we read from tape, not cache
-        # Only on Linux - macOS doesn't support vm.drop_caches
-        if config.platform.name == "linux":
-            console.print("[dim]Clearing page cache to force tape reads...[/dim]")
-            try:
-                # Sync to ensure all writes are flushed
-                subprocess.run(["sync"], check=False)
-                # Drop page cache (requires sudo or appropriate permissions)
-                # This writes 3 to /proc/sys/vm/drop_caches which drops page cache, dentries, and inodes
-                subprocess.run(
-                    ["sudo", "-n", "sysctl", "-w", "vm.drop_caches=3"],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    check=False,
-                )
-                console.print("[dim]Page cache cleared[/dim]")
-            except Exception as e:
-                console.print(f"[yellow]Warning:[/yellow] Could not drop page cache: {e}")
-                console.print("[yellow]Verification may read from cache instead of tape![/yellow]")
+        # Sync so the pages rsync wrote are clean; each destination file's
+        # pages are then dropped just before it is verified, so the hash is
+        # computed from tape rather than from cache. This targets only our
+        # own files and needs no sudo, unlike vm.drop_caches.
+        os.sync()
+        drop_cache = hasattr(os, "posix_fadvise")
+        if not drop_cache:
+            console.print("[yellow]Warning:[/yellow] Cannot drop cached pages on this platform")
+            console.print("[yellow]Verification may read from cache instead of tape![/yellow]")
 
         phase3_start = datetime.now(timezone.utc)
         console.print("[bold blue]Phase 3:[/bold blue] Verifying destination files...")
 
         # Calculate total bytes for verification progress (using stored sizes)
-        verify_bytes_total = sum(
-            file_size for (file_hash, file_size) in source_hashes.values()
-        )
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            TextColumn("•"),
-            DownloadColumn(),
-            TextColumn("•"),
-            TransferSpeedColumn(),
-            TimeElapsedColumn(),
-            console=console,
-        ) as progress:
+        verify_bytes_total = source_hashes.total_size()
+
+        with Progress(*_progress_columns(), console=console) as progress:
             task = progress.add_task("Verifying", total=verify_bytes_total)
 
             bytes_verified = 0
+            last_description = 0.0
+            # Files found on the destination, for the missing-file check
+            seen: set[str] = set()
 
             # Read files sequentially from tape (filesystem order = tape physical order)
             # Then look up expected hash from dictionary (fast memory lookup)
-            for path in result.destination.rglob("*"):
-                if path.is_file():
-                    # Normalize path for comparison (LTFS uses NFC, source may use NFD)
-                    rel_path = normalize_path(str(path.relative_to(result.destination)))
+            for entry, rel_str in iter_files(result.destination):
+                # Normalize path for comparison (LTFS uses NFC, source may use NFD)
+                rel_path = normalize_path(rel_str)
 
-                    # Skip files not in our hash dictionary (shouldn't happen)
-                    if rel_path not in source_hashes:
-                        continue
+                # Skip files not in our hash dictionary (shouldn't happen)
+                if rel_path not in source_hashes:
+                    continue
 
-                    source_hash, expected_size = source_hashes[rel_path]
+                seen.add(rel_path)
+                source_hash, expected_size = source_hashes[rel_path]
 
-                    # Update description with current file
+                # Update description with current file (throttled, see Phase 1)
+                now = time.monotonic()
+                if now - last_description >= DESCRIPTION_INTERVAL:
                     progress.update(task, description=f"Verifying: {str(rel_path)[:60]}")
+                    last_description = now
 
-                    try:
-                        dest_hash = hash_file(path)
-                        file_size = path.stat().st_size
-
-                        if source_hash == dest_hash:
-                            result.files_verified += 1
-                        else:
-                            result.files_failed += 1
-                            result.failed_files.append(f"{rel_path} (hash mismatch)")
-                            console.print(f"[red]MISMATCH:[/red] {rel_path}")
-
-                        bytes_verified += file_size
-                        progress.update(task, completed=bytes_verified)
-                    except OSError as e:
+                try:
+                    if drop_cache:
+                        drop_page_cache(Path(entry.path))
+                    # Read ahead on a background thread while hashing, so the
+                    # drive keeps streaming instead of waiting on each hash
+                    dest_hash = hash_file_pipelined(Path(entry.path))
+
+                    if source_hash == dest_hash:
+                        result.files_verified += 1
+                    else:
                         result.files_failed += 1
-                        result.failed_files.append(f"{rel_path} (read error: {e})")
-
-            # Check for missing files (in source_hashes but not on destination)
-            # Normalize paths for comparison (LTFS uses NFC, source may use NFD)
-            dest_files = {
-                normalize_path(str(p.relative_to(result.destination)))
-                for p in result.destination.rglob("*")
-                if p.is_file()
-            }
-            for rel_path in source_hashes.keys():
+                        result.failed_files.append(f"{rel_path} (hash mismatch)")
+                        console.print(f"[red]MISMATCH:[/red] {rel_path}")
+
+                    # Progress uses the size recorded at hash time, saving a
+                    # stat() per file; a size change shows up as a mismatch
+                    bytes_verified += expected_size
+                    progress.update(task, completed=bytes_verified)
+                except OSError as e:
+                    result.files_failed += 1
+                    result.failed_files.append(f"{rel_path} (read error: {e})")
+
+            # Check for missing files (in source_hashes but not on destination),
+            # reusing the walk above rather than traversing the tape again
+            for rel_path in source_hashes:
                 # rel_path is already normalized when stored in source_hashes
-                if rel_path not in dest_files:
+                if rel_path not in seen:
                     result.files_failed += 1
                     result.failed_files.append(f"{rel_path} (missing)")
                     console.print(f"[red]MISSING:[/red] {rel_path}")
@@ -441,8 +703,7 @@ def transfer(
             f.write(f"Started: {phase3_start.isoformat()}\n")
             f.write(f"Finished: {phase3_end.isoformat()}\n")
             f.write(f"Duration: {phase3_duration:.2f}s\n")
-            total_mb = result.bytes_total / (1024 * 1024)
-            f.write(f"Throughput: {total_mb / phase3_duration:.1f} MB/s\n")
+            f.write(f"Throughput: {_mb_per_second(result.bytes_total, phase3_duration):.1f} MB/s\n")
             f.write(f"Files verified: {result.files_verified}\n")
             f.write(f"Files failed: {result.files_failed}\n")
             if result.failed_files:
@@ -452,89 +713,83 @@ def transfer(
     else:
         phase3_duration = 0.0
 
-    # Phase 4: Generate MHL file
-    console.print("[bold blue]Phase 4:[/bold blue] Generating MHL file...")
+    # Phases 4 and 5a: Generate the MHL file and the zero-byte catalog files
+    # (legacy/browsable format) in one pass over source_hashes, so each tape
+    # file is stat'ed once for the MHL entry, the catalog file's timestamps
+    # and the database record
+    console.print("[bold blue]Phase 4:[/bold blue] Generating MHL file and catalog files...")
     phase4_start = datetime.now(timezone.utc)
 
-    mhl = MHL(
-        creator_info=CreatorInfo.default(),
-        tape_info=TapeInfo(name=tape_name),
-    )
-    mhl.creator_info.start_date = start_time
-    mhl.creator_info.finish_date = datetime.now(timezone.utc)
-
-    for rel_path, (file_hash, file_size) in source_hashes.items():
-        # Use tape file for mtime (normalized path works on LTFS)
-        tape_file = result.destination / rel_path
-        try:
-            stat = tape_file.stat()
-            mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
-        except OSError:
-            mtime = None
-
-        mhl.add_hash(
-            HashEntry(
-                file=rel_path,
-                size=file_size,
-                xxhash64be=file_hash,
-                last_modification_date=mtime,
-                hash_date=datetime.now(timezone.utc),
-            )
-        )
-
-    mhl_path = config.mhl_dir / f"{tape_name}_{source_name}_{timestamp}.mhl"
-    mhl.save(mhl_path)
-    result.mhl_path = mhl_path
+    creator_info = CreatorInfo.default()
+    creator_info.start_date = start_time
+    creator_info.finish_date = datetime.now(timezone.utc)
 
-    phase4_end = datetime.now(timezone.utc)
-    phase4_duration = (phase4_end - phase4_start).total_seconds()
+    # Hashes were all computed in earlier phases; stamp them with one time
+    # (MHL dates have one-second resolution anyway)
+    hash_date = datetime.now(timezone.utc)
 
-    # Phase 5: Update catalog (zero-byte files + SQLite database)
-    console.print("[bold blue]Phase 5:[/bold blue] Updating catalog...")
-    phase5_start = datetime.now(timezone.utc)
-
-    # 5a: Create zero-byte catalog files (legacy/browsable format)
     catalog_tape_dir = config.catalog_dir / tape_name / source_name
     catalog_tape_dir.mkdir(parents=True, exist_ok=True)
 
-    for rel_path in source_hashes.keys():
-        # Use tape file for mtime (normalized path works on LTFS)
-        tape_file = result.destination / rel_path
-        catalog_file = catalog_tape_dir / rel_path
+    # File records for the database: (path, size, mtime, xxhash)
+    db_files = []
+    # Directories already created, so files sharing one only mkdir once
+    made_dirs: set[Path] = {catalog_tape_dir}
 
-        catalog_file.parent.mkdir(parents=True, exist_ok=True)
-        catalog_file.touch()
+    # MHL entries are written out as they are built rather than collected first
+    mhl_path = config.mhl_dir / f"{tape_name}_{source_name}_{timestamp}.mhl"
+    with MHL.open_streaming(mhl_path, creator_info, TapeInfo(name=tape_name)) as mhl_writer:
+        for rel_path, (file_hash, file_size) in source_hashes.items():
+            # Use tape file for mtime (normalized path works on LTFS)
+            tape_file = result.destination / rel_path
+            try:
+                stat = os.stat(tape_file)
+                mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+            except OSError:
+                stat = None
+                mtime = None
 
-        # Preserve original timestamp from tape (LTFS preserves mtimes)
-        try:
-            stat = tape_file.stat()
-            import os
+            mhl_writer.add_hash(
+                HashEntry(
+                    file=rel_path,
+                    size=file_size,
+                    xxhash64be=file_hash,
+                    last_modification_date=mtime,
+                    hash_date=hash_date,
+                )
+            )
 
-            os.utime(catalog_file, (stat.st_atime, stat.st_mtime))
-        except OSError:
-            pass
+            catalog_file = catalog_tape_dir / rel_path
+            if catalog_file.parent not in made_dirs:
+                catalog_file.parent.mkdir(parents=True, exist_ok=True)
+                made_dirs.add(catalog_file.parent)
+            open(catalog_file, "wb").close()
+
+            # Preserve original timestamp from tape (LTFS preserves mtimes)
+            if stat is not None:
+                try:
+                    os.utime(catalog_file, (stat.st_atime, stat.st_mtime))
+                except OSError:
+                    pass
 
+            db_files.append((rel_path, file_size, mtime, file_hash))
+
+    result.mhl_path = mhl_path
     result.catalog_path = catalog_tape_dir
 
-    # 5b: Update SQLite catalog database
+    phase4_end = datetime.now(timezone.utc)
+    phase4_duration = (phase4_end - phase4_start).total_seconds()
+
+    # Phase 5: Update the SQLite catalog database
+    console.print("[bold blue]Phase 5:[/bold blue] Updating catalog database...")
+    phase5_start = datetime.now(timezone.utc)
+
+    # Update SQLite catalog database (a single transaction)
     try:
         from .catalog_db import CatalogDB
 
         db = CatalogDB(config=config)
         db.add_tape(name=tape_name)
-
-        # Prepare file records: (path, size, mtime, xxhash)
-        db_files = []
-        for rel_path, (file_hash, file_size) in source_hashes.items():
-            # Get mtime from tape file
-            tape_file = result.destination / rel_path
-            try:
-                mtime = datetime.fromtimestamp(tape_file.stat().st_mtime, tz=timezone.utc)
-            except OSError:
-                mtime = None
-
-            db_files.append((rel_path, file_size, mtime, file_hash))
-
         db.add_files(tape_name, db_files, archived_at=datetime.now(timezone.utc))
         console.print(f"[dim]Added {len(db_files)} files to catalog database[/dim]")
     except Exception as e:
@@ -554,11 +809,11 @@ def transfer(
     result.phase4_duration = phase4_duration
     result.phase5_duration = phase5_duration
 
-    # Calculate throughput for each phase
-    total_mb = result.bytes_total / (1024 * 1024)
-    phase1_throughput = total_mb / phase1_duration if phase1_duration > 0 else 0
-    phase2_throughput = total_mb / phase2_duration if phase2_duration > 0 else 0
-    phase3_throughput = total_mb / phase3_duration if phase3_duration > 0 else 0
+    # Throughput for each phase (same values as the TransferResult properties)
+    phase1_throughput = result.phase1_throughput
+    phase2_throughput = result.phase2_throughput
+    phase3_throughput = result.phase3_throughput
+    overall_throughput = result.overall_throughput
 
     # Update log with final stats
     with open(log_path, "a") as f:
@@ -578,43 +833,82 @@ def transfer(
             f.write(f"Phase 3 (Verify):         {phase3_duration:8.2f}s  ({phase3_throughput:6.1f} MB/s)\n")
         f.write(f"Phase 4 (MHL):            {phase4_duration:8.2f}s\n")
         f.write(f"Phase 5 (Catalog):        {phase5_duration:8.2f}s\n")
-        f.write(f"Overall throughput:       {total_mb / result.duration_seconds:6.1f} MB/s\n")
+        f.write(f"Overall throughput:       {overall_throughput:6.1f} MB/s\n")
 
     return result
 
 
-def _should_exclude(path: Path, patterns: list[str]) -> bool:
-    """Check if a path matches any exclude pattern.
+class ExcludeMatcher:
+    """
+    Exclude patterns compiled once for matching against many paths.
 
     Patterns:
     - Exact match: checks if pattern appears in any path component
     - Full-path glob (contains /): uses fnmatch on entire path
     - Glob patterns (with * or ?): uses fnmatch on each path component
     - Directory patterns (ending with /): matches directory names
-    """
-    import fnmatch
 
-    path_str = str(path)
-    path_parts = path.parts
+    Component and directory globs are merged into a single regex, so each
+    path component is tested with one match() call regardless of how many
+    patterns there are.
+    """
 
-    for pattern in patterns:
-        # Directory pattern (ends with /)
-        if pattern.endswith("/"):
-            dir_pattern = pattern[:-1]
-            for part in path_parts:
-                if part == dir_pattern or fnmatch.fnmatch(part, dir_pattern):
-                    return True
-        # Full-path glob pattern (contains / and wildcards)
-        elif ("*" in pattern or "?" in pattern) and "/" in pattern:
-            if fnmatch.fnmatch(path_str, pattern):
+    def __init__(self, patterns: Iterable[str]):
+        component = []
+        full_path = []
+        substrings = []
+
+        for pattern in patterns:
+            # Directory pattern (ends with /)
+            if pattern.endswith("/"):
+                component.append(fnmatch.translate(pattern[:-1]))
+                # Exact name matches even if it contains [ or other glob syntax
+                component.append(re.escape(pattern[:-1]) + r"\Z")
+            # Full-path glob pattern (contains / and wildcards)
+            elif ("*" in pattern or "?" in pattern) and "/" in pattern:
+                full_path.append(fnmatch.translate(pattern))
+            # Component glob pattern (contains * or ?)
+            elif "*" in pattern or "?" in pattern:
+                component.append(fnmatch.translate(pattern))
+            # Exact substring match
+            else:
+                substrings.append(pattern)
+
+        self._component = _compile_alternation(component)
+        self._full_path = _compile_alternation(full_path)
+        self._substrings = tuple(substrings)
+
+    def matches(self, path: str) -> bool:
+        """Check if a relative path (as a string) matches any pattern."""
+        for substring in self._substrings:
+            if substring in path:
                 return True
-        # Component glob pattern (contains * or ?)
-        elif "*" in pattern or "?" in pattern:
-            for part in path_parts:
-                if fnmatch.fnmatch(part, pattern):
-                    return True
-        # Exact substring match
-        elif pattern in path_str:
+
+        if self._full_path is not None and self._full_path.match(path):
             return True
 
-    return False
+        if self._component is not None:
+            match = self._component.match
+            for part in path.split(os.sep):
+                if match(part):
+                    return True
+
+        return False
+
+
+def _compile_alternation(regexes: list[str]) -> Optional[re.Pattern]:
+    """Compile regexes into one pattern matching any of them, or None if empty."""
+    if not regexes:
+        return None
+    return re.compile("|".join(f"(?:{regex})" for regex in regexes))
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_excludes(patterns: tuple[str, ...]) -> ExcludeMatcher:
+    """Build (and cache) the matcher for a set of exclude patterns."""
+    return ExcludeMatcher(patterns)
+
+
+def _should_exclude(path: Path, patterns: list[str]) -> bool:
+    """Check if a path matches any exclude pattern (see ExcludeMatcher)."""
+    return _compile_excludes(tuple(patterns)).matches(str(path))
@@ -2,9 +2,19 @@
 Utility functions for ltfs-tools.
 """
 
+import functools
+import os
+import sys
 import unicodedata
 from pathlib import Path
-from typing import Union
+from typing import Iterator, Union
+
+# Keyword arguments for @dataclass on classes that are created in bulk (one
+# per file on a tape). slots=True drops the per-instance __dict__, but needs
+# Python 3.10; on 3.9 those classes simply keep their __dict__.
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
 
 
 def normalize_path(path: Union[str, Path]) -> str:
@@ -27,6 +37,15 @@ def normalize_path(path: Union[str, Path]) -> str:
         NFC-normalized path string
     """
     path_str = str(path)
+    # ASCII strings are already NFC
+    if path_str.isascii():
+        return path_str
+    return _normalize_nfc(path_str)
+
+
+@functools.lru_cache(maxsize=131072)
+def _normalize_nfc(path_str: str) -> str:
+    """NFC-normalize a non-ASCII string, caching repeated paths."""
     return unicodedata.normalize("NFC", path_str)
 
 
@@ -44,3 +63,74 @@ def normalize_path_for_storage(path: Union[str, Path]) -> str:
         NFC-normalized path string
     """
     return normalize_path(path)
+
+
+def iter_files(
+    root: Union[str, Path], include_dirs: bool = False
+) -> Iterator[tuple[os.DirEntry, str]]:
+    """
+    Walk a directory tree yielding every file with its path relative to root.
+
+    Built on os.scandir: file types come from the directory listing and
+    DirEntry.stat() is cached, so unlike Path.rglob() no Path object or
+    extra stat() call is needed per entry. Matches rglob("*") + is_file():
+    symlinks to files are included, symlinked directories are not entered,
+    and unreadable directories are skipped.
+
+    Args:
+        root: Directory to walk
+        include_dirs: Also yield directories (including symlinked ones,
+            which are still not entered); tell them apart with entry.is_dir()
+
+    Yields:
+        Tuples of (DirEntry, relative path string)
+    """
+    stack = [(os.fspath(root), "")]
+    while stack:
+        dirpath, prefix = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, prefix + entry.name + os.sep))
+                            if include_dirs:
+                                yield entry, prefix + entry.name
+                        elif entry.is_file():
+                            yield entry, prefix + entry.name
+                        elif include_dirs and entry.is_dir():
+                            yield entry, prefix + entry.name
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def format_bytes(size: Union[int, float]) -> str:
+    """
+    Format a byte count as a human readable string (e.g. "4.77 MB").
+
+    Integer sizes are formatted with shifts and integer division, which is
+    several times faster than repeated float division when formatting large
+    result tables; the output is identical to ``f"{size / 1024**n:.2f}"``.
+
+    Args:
+        size: Number of bytes
+
+    Returns:
+        Size with two decimals and a binary unit (B through PB)
+    """
+    if not isinstance(size, int) or size < 1024:
+        for unit in _BYTE_UNITS[:-1]:
+            if size < 1024:
+                return f"{size:.2f} {unit}"
+            size /= 1024
+        return f"{size:.2f} PB"
+
+    shift = min((size.bit_length() - 1) // 10, len(_BYTE_UNITS) - 1) * 10
+    hundredths, remainder = divmod(size * 100, 1 << shift)
+    # Round half to even, matching float formatting of the exact quotient
+    half = 1 << (shift - 1)
+    if remainder > half or (remainder == half and hundredths & 1):
+        hundredths += 1
+    return f"{hundredths // 100}.{hundredths % 100:02d} {_BYTE_UNITS[shift // 10]}"
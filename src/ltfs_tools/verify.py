@@ -2,9 +2,12 @@
 Verification operations using MHL files.
 """
 
+import os
+import queue
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Union
 
 from rich.console import Console
 from rich.progress import (
@@ -16,12 +19,15 @@ from rich.progress import (
 )
 
 from .config import Config, get_config
-from .hash import hash_file
-from .mhl import MHL
+from .hash import DEFAULT_CHUNK_SIZE, hash_fd_int, parse_hash, verify_hash
+from .mhl import MHL, HashEntry
 from .utils import normalize_path
 
 console = Console()
 
+# Number of files opened ahead of the one being hashed
+PREFETCH_DEPTH = 2
+
 
 @dataclass
 class VerifyResult:
@@ -47,6 +53,61 @@ class VerifyError(Exception):
     pass
 
 
+def _open_ahead(
+    base_path: Path,
+    entries: Iterable[HashEntry],
+    depth: int = PREFETCH_DEPTH,
+) -> Iterator[tuple[HashEntry, Union[int, OSError]]]:
+    """
+    Open the files listed in an MHL on a background thread.
+
+    While the caller hashes one file, the thread opens the next ones and asks
+    the kernel to start reading their first chunk (POSIX_FADV_WILLNEED), so
+    the device isn't left idle between files.
+
+    Yields:
+        (entry, fd) for each entry, or (entry, error) if it could not be
+        opened. The caller owns and must close each yielded fd.
+    """
+    opened: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def opener() -> None:
+        try:
+            for entry in entries:
+                if stop.is_set():
+                    break
+                try:
+                    fd = os.open(base_path / entry.file, os.O_RDONLY)
+                except OSError as e:
+                    opened.put((entry, e))
+                    continue
+                if hasattr(os, "posix_fadvise"):
+                    try:
+                        os.posix_fadvise(fd, 0, DEFAULT_CHUNK_SIZE, os.POSIX_FADV_WILLNEED)
+                    except OSError:
+                        pass
+                opened.put((entry, fd))
+        finally:
+            opened.put(done)
+
+    thread = threading.Thread(target=opener, name="verify-opener", daemon=True)
+    thread.start()
+    try:
+        while (item := opened.get()) is not done:
+            yield item
+    finally:
+        stop.set()
+        # Drain (closing fds that were opened but not consumed) so the
+        # thread can't stay blocked on a full queue
+        while item is not done:
+            item = opened.get()
+            if item is not done and isinstance(item[1], int):
+                os.close(item[1])
+        thread.join()
+
+
 def verify(
     mhl_path: Path,
     base_path: Optional[Path] = None,
@@ -105,26 +166,31 @@ def verify(
     ) as progress:
         task = progress.add_task("Verifying", total=result.total_files)
 
-        for entry in mhl:
-            file_path = base_path / entry.file
-
-            if not file_path.exists():
+        # Files are opened a little ahead on a background thread so the next
+        # read is already under way while the current file is hashed
+        for entry, fd in _open_ahead(base_path, mhl):
+            if isinstance(fd, (FileNotFoundError, NotADirectoryError)):
                 result.missing += 1
                 result.missing_files.append(entry.file)
+            elif isinstance(fd, OSError):
+                result.failed += 1
+                result.failed_files.append(f"{entry.file} (read error: {fd})")
             else:
                 try:
-                    actual_hash = hash_file(file_path)
+                    actual_hash = hash_fd_int(fd)
 
-                    if actual_hash.lower() == entry.xxhash64be.lower():
+                    if actual_hash == parse_hash(entry.xxhash64be):
                         result.verified += 1
                     else:
                         result.failed += 1
                         result.failed_files.append(
-                            f"{entry.file} (expected: {entry.xxhash64be}, got: {actual_hash})"
+                            f"{entry.file} (expected: {entry.xxhash64be}, got: {actual_hash:016x})"
                         )
                 except OSError as e:
                     result.failed += 1
                     result.failed_files.append(f"{entry.file} (read error: {e})")
+                finally:
+                    os.close(fd)
 
             progress.advance(task)
 
@@ -148,8 +214,7 @@ def verify_file(
     if not file_path.exists():
         return False
 
-    actual_hash = hash_file(file_path)
-    return actual_hash.lower() == expected_hash.lower()
+    return verify_hash(file_path, expected_hash)
 
 
 def compare_mhl_files(mhl1_path: Path, mhl2_path: Path) -> dict:
@@ -170,22 +235,22 @@ def compare_mhl_files(mhl1_path: Path, mhl2_path: Path) -> dict:
     mhl1 = MHL.load(mhl1_path)
     mhl2 = MHL.load(mhl2_path)
 
-    # Paths are already normalized by MHL.load(), but normalize again for safety
-    hashes1 = {normalize_path(entry.file): entry.xxhash64be for entry in mhl1}
-    hashes2 = {normalize_path(entry.file): entry.xxhash64be for entry in mhl2}
-
-    files1 = set(hashes1.keys())
-    files2 = set(hashes2.keys())
-
-    common_files = files1 & files2
-    only_in_first = files1 - files2
-    only_in_second = files2 - files1
+    # Paths are already normalized by MHL.load(), but normalize again for safety.
+    # Hashes are lowercased once here rather than on every comparison.
+    hashes1 = {normalize_path(entry.file): entry.xxhash64be.lower() for entry in mhl1}
+    hashes2 = {normalize_path(entry.file): entry.xxhash64be.lower() for entry in mhl2}
 
+    # Single pass over the first list; whatever is left in hashes2 afterwards
+    # only appears in the second
     matching = []
     different = []
+    only_in_first = []
 
-    for f in common_files:
-        if hashes1[f].lower() == hashes2[f].lower():
+    for f, hash1 in hashes1.items():
+        hash2 = hashes2.pop(f, None)
+        if hash2 is None:
+            only_in_first.append(f)
+        elif hash1 == hash2:
             matching.append(f)
         else:
             different.append(f)
@@ -194,5 +259,5 @@ def compare_mhl_files(mhl1_path: Path, mhl2_path: Path) -> dict:
         "common": sorted(matching),
         "different": sorted(different),
         "only_in_first": sorted(only_in_first),
-        "only_in_second": sorted(only_in_second),
+        "only_in_second": sorted(hashes2),
     }
@@ -2,14 +2,30 @@
 Tests for LTFS tools.
 """
 
+import os
 import tempfile
+import xml.etree.ElementTree as ET
 from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
 
-from ltfs_tools.hash import hash_bytes, hash_file
+from ltfs_tools.hash import (
+    hash_bytes,
+    hash_fd_int,
+    hash_file,
+    hash_file_int,
+    hash_file_pipelined,
+    hash_files,
+    verify_hash,
+)
+from ltfs_tools.catalog import search_catalogs
+from ltfs_tools.catalog_db import CatalogDB
+from ltfs_tools.config import Config
+from ltfs_tools.ltfs_index import LTFSIndexParser
 from ltfs_tools.mhl import MHL, CreatorInfo, HashEntry, TapeInfo
+from ltfs_tools.transfer import ExcludeMatcher, SourceHashes, _copy_and_hash
+from ltfs_tools.utils import format_bytes, iter_files, normalize_path
 
 
 class TestHash:
@@ -39,6 +55,82 @@ class TestHash:
             # Should match hashing the same bytes
             assert result == hash_bytes(b"test file content")
 
+    def test_hash_algorithm_xxh3(self):
+        """Test selecting XXH3 instead of the default XXH64."""
+        data = b"test data 12345"
+        xxh3 = hash_bytes(data, algorithm="xxh3")
+        assert len(xxh3) == 16
+        assert xxh3 != hash_bytes(data)
+
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+            f.flush()
+            assert hash_file(Path(f.name), algorithm="xxh3") == xxh3
+
+    def test_hash_file_progress(self, tmp_path):
+        """Test chunked hashing with a progress callback."""
+        data = bytes(range(256)) * 1000
+        path = tmp_path / "data.bin"
+        path.write_bytes(data)
+
+        calls = []
+        result = hash_file(
+            path, chunk_size=4096, progress_callback=lambda n, t: calls.append((n, t))
+        )
+        assert result == hash_bytes(data)
+        assert len(calls) > 1
+        assert calls[-1] == (len(data), len(data))
+
+    def test_hash_file_pipelined(self):
+        """Test that the pipelined reader produces the same hash."""
+        data = bytes(range(256)) * 5000
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+            f.flush()
+            path = Path(f.name)
+            assert hash_file_pipelined(path, chunk_size=4096) == hash_bytes(data)
+
+    def test_hash_files(self, tmp_path):
+        """Test bulk hashing of small and chunk-read files."""
+        contents = {
+            tmp_path / "empty.bin": b"",
+            tmp_path / "small.bin": b"small",
+            tmp_path / "large.bin": bytes(range(256)) * 1024,
+        }
+        for path, data in contents.items():
+            path.write_bytes(data)
+
+        expected = {path: hash_bytes(data) for path, data in contents.items()}
+        assert hash_files(contents, workers=2) == expected
+        assert hash_files(contents, workers=2, group=2) == expected
+
+    def test_hash_fd_int(self, tmp_path):
+        """Test hashing an open file descriptor."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(bytes(range(256)) * 1000)
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            assert hash_fd_int(fd) == hash_file_int(path)
+        finally:
+            os.close(fd)
+
+    def test_verify_hash(self, tmp_path):
+        """Test integer hash comparison in verify_hash."""
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"verify me")
+        expected = hash_bytes(b"verify me")
+
+        assert hash_file_int(path) == int(expected, 16)
+        assert verify_hash(path, expected)
+        assert verify_hash(path, expected.upper())
+        assert not verify_hash(path, "0" * 16)
+        assert not verify_hash(path, "not-a-hash")
+
+    def test_hash_algorithm_unknown(self):
+        """Test that an unknown algorithm is rejected."""
+        with pytest.raises(ValueError):
+            hash_bytes(b"data", algorithm="md5")
+
 
 class TestMHL:
     """Tests for MHL file handling."""
@@ -113,6 +205,31 @@ class TestMHL:
         finally:
             path.unlink(missing_ok=True)
 
+    def test_mhl_save_matches_to_xml(self, tmp_path):
+        """Test that the streamed save output matches to_xml()."""
+        mhl = MHL(tape_info=TapeInfo(name="TEST01"))
+        for i in range(3):
+            mhl.add_hash(HashEntry(file=f"dir/<file&{i}>.txt", size=i, xxhash64be="00ff"))
+
+        path = tmp_path / "test.mhl"
+        mhl.save(path)
+        assert path.read_text(encoding="utf-8") == mhl.to_xml()
+        assert path.read_bytes() == mhl.to_xml_bytes()
+
+    def test_open_streaming(self, tmp_path):
+        """Test that the streaming writer produces the same file as save()."""
+        mhl = MHL(tape_info=TapeInfo(name="TEST01"))
+        for i in range(3):
+            mhl.add_hash(HashEntry(file=f"file{i}.txt", size=i, xxhash64be="00ff"))
+
+        path = tmp_path / "streamed.mhl"
+        with MHL.open_streaming(path, mhl.creator_info, mhl.tape_info) as writer:
+            for entry in mhl:
+                writer.add_hash(entry)
+
+        assert writer.count == 3
+        assert path.read_bytes() == mhl.to_xml_bytes()
+
 
 class TestHashEntry:
     """Tests for HashEntry."""
@@ -129,3 +246,383 @@ class TestHashEntry:
         assert elem.find("file").text == "test.txt"
         assert elem.find("size").text == "100"
         assert elem.find("xxhash64be").text == "abcdef1234567890"
+
+    def test_entry_to_xml_bytes(self):
+        """Test that direct serialization matches ElementTree's output."""
+        entries = [
+            HashEntry(file="a.txt", size=0, xxhash64be=""),
+            HashEntry(
+                file="R&D/<draft> \"v2\"\x01/café.mov",
+                size=123456789,
+                xxhash64be="abcdef1234567890",
+                last_modification_date=datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+                hash_date=datetime(2025, 6, 7, 8, 9, 10, tzinfo=timezone.utc),
+            ),
+        ]
+        for entry in entries:
+            elem = entry.to_element()
+            ET.indent(elem, space="    ", level=1)
+            assert entry.to_xml_bytes() == ET.tostring(elem, encoding="utf-8")
+
+
+SAMPLE_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<ltfsindex xmlns="http://www.ibm.com/xmlns/ltfs" version="2.4.0">
+  <creator>LTFS 2.4.0</creator>
+  <volumeuuid>1234-5678</volumeuuid>
+  <generationnumber>3</generationnumber>
+  <updatetime>2025-12-06T15:30:00.123456789Z</updatetime>
+  <directory>
+    <name>TAPE01</name>
+    <readonly>false</readonly>
+    <modifytime>2025-12-06T15:30:00Z</modifytime>
+    <contents>
+      <file>
+        <name>a.txt</name>
+        <length>10</length>
+        <readonly>false</readonly>
+        <modifytime>2025-12-06T15:30:00Z</modifytime>
+        <fileuid>2</fileuid>
+        <extentinfo>
+          <extent>
+            <fileoffset>0</fileoffset>
+            <partition>b</partition>
+            <startblock>120</startblock>
+            <byteoffset>0</byteoffset>
+            <bytecount>10</bytecount>
+          </extent>
+        </extentinfo>
+      </file>
+      <directory>
+        <name>sub</name>
+        <readonly>true</readonly>
+        <contents>
+          <file>
+            <name>b.txt</name>
+            <length>20</length>
+            <readonly>true</readonly>
+            <extentinfo>
+              <extent>
+                <fileoffset>0</fileoffset>
+                <partition>b</partition>
+                <startblock>100</startblock>
+                <byteoffset>0</byteoffset>
+                <bytecount>20</bytecount>
+              </extent>
+            </extentinfo>
+          </file>
+          <directory>
+            <name>empty</name>
+          </directory>
+        </contents>
+      </directory>
+    </contents>
+  </directory>
+</ltfsindex>
+"""
+
+
+class TestLTFSIndex:
+    """Tests for LTFS index parsing."""
+
+    def test_parse(self, tmp_path):
+        """Test parsing an index into a directory tree."""
+        index_file = tmp_path / "index.xml"
+        index_file.write_text(SAMPLE_INDEX, encoding="utf-8")
+
+        index = LTFSIndexParser.parse(index_file)
+        assert index.version == "2.4.0"
+        assert index.volume_uuid == "1234-5678"
+        assert index.generation == 3
+        assert index.creator == "LTFS 2.4.0"
+        assert index.root.path == "/"
+
+        files = LTFSIndexParser.get_all_files(index)
+        assert [(f.path, f.size, f.readonly) for f in files] == [
+            ("/a.txt", 10, False),
+            ("/sub/b.txt", 20, True),
+        ]
+        assert files[0].uid == "2"
+        assert files[0].modify_time == datetime(2025, 12, 6, 15, 30, tzinfo=timezone.utc)
+
+        dirs = LTFSIndexParser.get_all_directories(index)
+        assert [d.path for d in dirs] == ["/", "/sub", "/sub/empty"]
+        assert dirs[1].readonly
+
+    def test_to_columns(self, tmp_path):
+        """Test the column view and tape ordering of index files."""
+        index_file = tmp_path / "index.xml"
+        index_file.write_text(SAMPLE_INDEX, encoding="utf-8")
+
+        index = LTFSIndexParser.parse(index_file)
+        files = LTFSIndexParser.get_all_files(index)
+        assert files[0].extents[0].start_block == 120
+        assert files[0].extents[0].byte_count == 10
+
+        columns = index.to_columns()
+        assert len(columns) == 2
+        assert columns.total_size() == 30
+        assert [columns.paths[i] for i in columns.tape_order()] == ["/sub/b.txt", "/a.txt"]
+
+
+class TestCatalogDB:
+    """Tests for the SQLite catalog database."""
+
+    def _db(self, tmp_path):
+        return CatalogDB(db_path=tmp_path / "catalog.db")
+
+    def test_add_and_search_files(self, tmp_path):
+        """Test adding files and searching by pattern."""
+        db = self._db(tmp_path)
+        added = db.add_files("TAPE01", [
+            ("project/a.mov", 100, None, "aaaa"),
+            ("project/b.txt", 200, None, "bbbb"),
+        ])
+        assert added == 2
+
+        results = db.search("*.mov")
+        assert [r.path for r in results] == ["project/a.mov"]
+        assert db.get_tape_stats("TAPE01").total_bytes == 300
+
+    def test_search_trigram_matches_like(self, tmp_path):
+        """Test that trigram-indexed search returns the same rows as LIKE."""
+        db = self._db(tmp_path)
+        db.add_files("TAPE01", [
+            ("Project/Clip_001.MOV", 1, None, None),
+            ("project/notes.txt", 2, None, None),
+            ("other/clip_002.mov", 3, None, None),
+        ])
+        for pattern in ["*.mov", "project/*", "*clip*", "*.t?t"]:
+            indexed = db.search(pattern)
+            db._has_trigram = False
+            scanned = db.search(pattern)
+            db._has_trigram = True
+            assert indexed == scanned, pattern
+        assert len(db.search("*clip*")) == 2
+
+    def test_search_after(self, tmp_path):
+        """Test keyset pagination through search results."""
+        db = self._db(tmp_path)
+        db.add_files("TAPE01", [(f"f{i}.mov", i, None, None) for i in range(5)])
+        db.add_files("TAPE02", [("g.mov", 1, None, None)])
+
+        pages = []
+        after = None
+        while page := db.search("*.mov", limit=2, after=after):
+            pages.append([r.path for r in page])
+            after = (page[-1].tape_name, page[-1].path)
+
+        assert pages == [["f0.mov", "f1.mov"], ["f2.mov", "f3.mov"], ["f4.mov", "g.mov"]]
+
+    def test_iter_search_batches(self, tmp_path):
+        """Test that iter_search yields the same rows as search across batches."""
+        db = self._db(tmp_path)
+        db.add_files("TAPE01", [(f"f{i:02d}.mov", i, None, None) for i in range(25)])
+
+        streamed = list(db.iter_search("*.mov", limit=20, batch_size=7))
+        assert streamed == db.search("*.mov", limit=20)
+        assert len(streamed) == 20
+
+    def test_search_summary(self, tmp_path):
+        """Test per-tape aggregation of search matches."""
+        db = self._db(tmp_path)
+        db.add_files("TAPE01", [("a.mov", 10, None, None), ("b.mov", 20, None, None)])
+        db.add_files("TAPE02", [("c.mov", 5, None, None), ("d.txt", 7, None, None)])
+
+        assert db.search_summary("*.mov") == [("TAPE01", 2, 30), ("TAPE02", 1, 5)]
+        assert db.search_summary("*.mov", "TAPE02") == [("TAPE02", 1, 5)]
+
+    def test_find_by_hashes(self, tmp_path):
+        """Test batched hash lookup across chunks."""
+        db = self._db(tmp_path)
+        db.add_files("TAPE01", [("a.mov", 1, None, "aaaa"), ("b.mov", 2, None, "bbbb")])
+        db.add_files("TAPE02", [("a.mov", 1, None, "aaaa")])
+
+        found = db.find_by_hashes(["aaaa", "bbbb", "cccc"], chunk_size=2)
+        assert set(found) == {"aaaa", "bbbb"}
+        assert [r.tape_name for r in found["aaaa"]] == ["TAPE01", "TAPE02"]
+
+    def test_duplicate_hash_summary(self, tmp_path):
+        """Test duplicate aggregation, ordering and limit."""
+        db = self._db(tmp_path)
+        db.add_files("TAPE01", [("a.mov", 10, None, "aaaa"), ("b.mov", 500, None, "bbbb")])
+        db.add_files("TAPE02", [("a.mov", 10, None, "aaaa"), ("b.mov", 500, None, "bbbb")])
+        db.add_files("TAPE03", [("a.mov", 10, None, "aaaa")])
+
+        assert db.duplicate_hash_summary() == [("bbbb", 2, 500), ("aaaa", 3, 20)]
+        assert db.duplicate_hash_summary(limit=1) == [("bbbb", 2, 500)]
+        assert db.duplicate_hash_summary(min_size=100) == [("bbbb", 2, 500)]
+        assert [len(files) for _, files in db.find_duplicates()] == [2, 3]
+
+    def test_import_from_mhl(self, tmp_path):
+        """Test streaming import of an MHL larger than one insert batch."""
+        mtime = datetime(2024, 6, 1, 12, 0, 0, tzinfo=timezone.utc)
+        mhl = MHL(tape_info=TapeInfo(name="TEST01", serial="SN123"))
+        for i in range(2500):
+            mhl.add_hash(HashEntry(
+                file=f"dir/file{i:04d}.bin",
+                size=i,
+                xxhash64be=f"{i:016x}",
+                last_modification_date=mtime,
+            ))
+        mhl_path = tmp_path / "TEST01_src.mhl"
+        mhl.save(mhl_path)
+
+        db = self._db(tmp_path)
+        assert db.import_from_mhl(mhl_path) == 2500
+
+        stats = db.get_tape_stats("TEST01")
+        assert stats.file_count == 2500
+        assert stats.total_bytes == sum(range(2500))
+        assert db.list_tapes()[0].barcode == "SN123"
+
+        result = db.find_by_hash(f"{42:016x}")[0]
+        assert result.path == "dir/file0042.bin"
+        assert result.mtime == mtime
+
+    def test_reopen_shares_instance(self, tmp_path):
+        """Test that reopen() returns one instance per database path."""
+        db = CatalogDB.reopen(db_path=tmp_path / "catalog.db")
+        assert CatalogDB.reopen(db_path=tmp_path / "catalog.db") is db
+        assert CatalogDB.reopen(db_path=tmp_path / "other.db") is not db
+
+        db.add_files("TAPE01", [("a.mov", 1, None, "aaaa")])
+        db.close()
+        assert db.get_summary()["file_count"] == 1
+
+    def test_bulk_transaction(self, tmp_path):
+        """Test that bulk_transaction commits or rolls back as a unit."""
+        db = self._db(tmp_path)
+        with db.bulk_transaction():
+            db.add_files("TAPE01", [("a.mov", 1, None, "aaaa")])
+            db.add_files("TAPE02", [("b.mov", 2, None, "bbbb")])
+        assert db.get_summary()["file_count"] == 2
+
+        with pytest.raises(RuntimeError):
+            with db.bulk_transaction():
+                db.add_files("TAPE03", [("c.mov", 3, None, "cccc")])
+                raise RuntimeError("abort")
+        assert db.get_tape_stats("TAPE03") is None
+
+    def test_bulk_import_truncated_mhl(self, tmp_path):
+        """Test that a failed import inside bulk_transaction leaves no rows."""
+        mhl = MHL(tape_info=TapeInfo(name="TEST01"))
+        for i in range(2500):
+            mhl.add_hash(HashEntry(file=f"file{i:04d}.bin", size=i, xxhash64be=f"{i:016x}"))
+        mhl_path = tmp_path / "TEST01_src.mhl"
+        mhl.save(mhl_path)
+        data = mhl_path.read_bytes()
+        mhl_path.write_bytes(data[: len(data) - 200])
+
+        db = self._db(tmp_path)
+        with db.bulk_transaction():
+            db.add_files("TAPE02", [("a.mov", 1, None, "aaaa")])
+            with pytest.raises(SyntaxError):
+                db.import_from_mhl(mhl_path)
+
+        assert db.get_tape_stats("TEST01") is None
+        assert db.get_summary()["file_count"] == 1
+        assert db.search("%.bin") == []
+
+
+class TestCatalog:
+    """Tests for zero-byte file catalogs."""
+
+    def test_search_catalogs_cache_invalidation(self, tmp_path):
+        """Test that cached search results pick up newly added files."""
+        config = Config(archive_base=tmp_path, device="test")
+        clip_dir = config.catalog_dir / "TAPE01" / "project" / "clips"
+        clip_dir.mkdir(parents=True)
+        (clip_dir / "a.mov").touch()
+
+        assert search_catalogs("*.mov", config=config) == [("TAPE01", "project/clips/a.mov")]
+
+        (clip_dir / "b.mov").touch()
+        # Force a visible mtime change on filesystems with coarse timestamps
+        os.utime(clip_dir, ns=(0, clip_dir.stat().st_mtime_ns + 1_000_000_000))
+
+        assert search_catalogs("*.mov", config=config) == [
+            ("TAPE01", "project/clips/a.mov"),
+            ("TAPE01", "project/clips/b.mov"),
+        ]
+
+
+class TestTransfer:
+    """Tests for transfer helpers."""
+
+    def test_copy_and_hash(self, tmp_path):
+        """Test that copying returns the source hash and size."""
+        data = bytes(range(256)) * 5000
+        src = tmp_path / "src.bin"
+        dst = tmp_path / "dst.bin"
+        src.write_bytes(data)
+
+        file_hash, size = _copy_and_hash(src, dst, bufsize=4096)
+        assert dst.read_bytes() == data
+        assert file_hash == hash_bytes(data)
+        assert size == len(data)
+
+    def test_source_hashes(self):
+        """Test the column-wise source hash store."""
+        hashes = SourceHashes()
+        hashes.add("b.txt", "00000000000000ff", 10)
+        hashes.add("a.txt", "fedcba9876543210", 20)
+        hashes.add("b.txt", "0000000000000001", 11)
+
+        assert len(hashes) == 2
+        assert "a.txt" in hashes and "c.txt" not in hashes
+        assert hashes["a.txt"] == ("fedcba9876543210", 20)
+        assert list(hashes.items()) == [
+            ("b.txt", ("0000000000000001", 11)),
+            ("a.txt", ("fedcba9876543210", 20)),
+        ]
+        assert hashes.total_size() == 31
+
+    def test_exclude_matcher(self):
+        """Test each kind of exclude pattern."""
+        matcher = ExcludeMatcher(Config(device="test").excludes + ["node_modules/"])
+        assert matcher.matches(".DS_Store")
+        assert matcher.matches(os.path.join("photos", "._IMG_0001.jpg"))
+        assert matcher.matches(os.path.join("home", "Library", "Caches", "x.db"))
+        assert matcher.matches(os.path.join("web", "node_modules", "pkg", "index.js"))
+        assert matcher.matches("scratch.tmp")
+        assert not matcher.matches(os.path.join("Library", "Preferences", "x.plist"))
+        assert not matcher.matches(os.path.join("docs", "notes.txt"))
+
+
+class TestUtils:
+    """Tests for utility functions."""
+
+    def test_format_bytes(self):
+        """Test human readable byte formatting."""
+        assert format_bytes(0) == "0.00 B"
+        assert format_bytes(1023) == "1023.00 B"
+        assert format_bytes(1024) == "1.00 KB"
+        assert format_bytes(5_000_000) == "4.77 MB"
+        assert format_bytes(1024**5 * 3) == "3.00 PB"
+        assert format_bytes(1024**6) == "1024.00 PB"
+        assert format_bytes(1536.0) == "1.50 KB"
+
+    def test_normalize_path(self):
+        """Test NFC normalization of decomposed and ASCII paths."""
+        assert normalize_path("cafe\u0301/file.txt") == "caf\u00e9/file.txt"
+        assert normalize_path(Path("plain/file.txt")) == "plain/file.txt"
+
+    def test_iter_files(self, tmp_path):
+        """Test that iter_files matches rglob and yields relative paths."""
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "top.txt").write_text("x")
+        (tmp_path / "a" / "mid.txt").write_text("xx")
+        (tmp_path / "a" / "b" / "deep.txt").write_text("xxx")
+        (tmp_path / "empty").mkdir()
+
+        found = {rel: entry.stat().st_size for entry, rel in iter_files(tmp_path)}
+        expected = {
+            str(p.relative_to(tmp_path)): p.stat().st_size
+            for p in tmp_path.rglob("*")
+            if p.is_file()
+        }
+        assert found == expected
+        assert found[os.path.join("a", "b", "deep.txt")] == 3
+
+        dirs = {rel for entry, rel in iter_files(tmp_path, include_dirs=True) if entry.is_dir()}
+        assert dirs == {"a", os.path.join("a", "b"), "empty"}
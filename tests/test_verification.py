@@ -9,10 +9,46 @@ Creates test files and simulates the verification process to ensure:
 4. No files are skipped
 """
 
+import argparse
+import json
+import os
+import queue
 import tempfile
 import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator, Optional, Union
 from ltfs_tools import hash_file
+from ltfs_tools.hash import HASH_ALGORITHMS, hash_fd_int, hash_files, parse_hash
+from ltfs_tools.transfer import ExcludeMatcher
+from ltfs_tools.utils import iter_files
+
+# Number of files hashed concurrently (override with --jobs). Capped because
+# tape drives serialize reads, so extra threads would only add seeking.
+JOBS = min(8, os.cpu_count() or 1)
+
+# The simulated phases only compare hashes with each other and never write an
+# MHL, so they can use XXH3, which is several times faster than the XXH64 that
+# MHL files record (override with --algorithm xxh64)
+ALGORITHM = "xxh3"
+
+# Print a line for every file that hashed or verified cleanly (--verbose).
+# Failures are always printed.
+VERBOSE = False
+
+# Destination files opened together in Phase 3. Bounded so that large trees
+# don't run into the open file limit.
+OPEN_BATCH = 256
+
+
+def write_lines(lines: list[str]) -> None:
+    """Write buffered per-file status lines with a single write call."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
 
 def create_test_files(base_dir: Path, num_files: int = 10, size_mb: int = 1):
     """Create test files with random data."""
@@ -30,6 +66,10 @@ def create_test_files(base_dir: Path, num_files: int = 10, size_mb: int = 1):
         base_dir / "subdir1" / "nested",
     ]
 
+    # One zero-filled chunk, written repeatedly (zeros for speed)
+    chunk_size = 1024 * 1024  # 1MB chunks
+    zero_chunk = memoryview(bytes(chunk_size))
+
     for i in range(num_files):
         # Distribute files across directories
         parent = paths[i % len(paths)]
@@ -39,11 +79,10 @@ def create_test_files(base_dir: Path, num_files: int = 10, size_mb: int = 1):
         size_bytes = size_mb * 1024 * 1024
         with open(file_path, 'wb') as f:
             # Write in chunks to handle large files
-            chunk_size = 1024 * 1024  # 1MB chunks
             remaining = size_bytes
             while remaining > 0:
                 write_size = min(chunk_size, remaining)
-                f.write(b'\x00' * write_size)  # Use zeros for speed
+                f.write(zero_chunk[:write_size])
                 remaining -= write_size
 
         files_created.append(file_path)
@@ -51,76 +90,220 @@ def create_test_files(base_dir: Path, num_files: int = 10, size_mb: int = 1):
     return files_created
 
 
-def simulate_phase1_hashing(source: Path, excluded_patterns: list[str]) -> dict[str, str]:
-    """Simulate Phase 1: Hash all source files."""
+@contextmanager
+def source_tree(copy: bool = False) -> Iterator[Path]:
+    """Temporary directory with 10 1MB test files in source/.
+
+    With copy=True the files are also copied to destination/ (copytree
+    preserves mtimes).
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        source = tmp / "source"
+        source.mkdir()
+
+        print("\nCreating 10 test files of 1MB each...")
+        create_test_files(source, num_files=10, size_mb=1)
+        if copy:
+            shutil.copytree(source, tmp / "destination", dirs_exist_ok=True)
+
+        yield tmp
+
+
+def simulate_phase1_hashing(
+    source: Path, excluded_patterns: list[str], jobs: Optional[int] = None
+) -> dict[str, str]:
+    """Simulate Phase 1: Hash all source files as one batch."""
     source_hashes = {}
 
     print(f"Phase 1: Hashing files in {source}")
-    for path in source.rglob("*"):
-        if path.is_file():
-            rel_path = str(path.relative_to(source))
-            file_hash = hash_file(path)
-            source_hashes[rel_path] = file_hash
-            print(f"  Hashed: {rel_path} -> {file_hash[:16]}...")
+    is_excluded = ExcludeMatcher(excluded_patterns).matches
+
+    # Parallel lists of relative and absolute path strings; no Path objects
+    # are built per file
+    rel_paths = []
+    abs_paths = []
+
+    for dirpath, dirnames, filenames in os.walk(source):
+        rel_dir = os.path.relpath(dirpath, source)
+        prefix = "" if rel_dir == os.curdir else rel_dir + os.sep
+        # Prune excluded directories in place so os.walk never lists them
+        dirnames[:] = [d for d in dirnames if not is_excluded(prefix + d)]
+        for name in filenames:
+            rel_path = prefix + name
+            if not is_excluded(rel_path):
+                rel_paths.append(rel_path)
+                abs_paths.append(os.path.join(dirpath, name))
+
+    # hash_files keeps several reads in flight and issues them in inode order.
+    # Each file is read exactly once, so its pages are dropped afterwards
+    # rather than left to evict other data from the page cache.
+    hashes = hash_files(abs_paths, workers=jobs or JOBS, algorithm=ALGORITHM, drop_cache=True)
+    lines = []
+    for rel_path, abs_path in zip(rel_paths, abs_paths):
+        file_hash = hashes[abs_path]
+        source_hashes[rel_path] = file_hash
+        if VERBOSE:
+            lines.append(f"  Hashed: {rel_path} -> {file_hash[:16]}...")
+    write_lines(lines)
 
     print(f"Phase 1 complete: {len(source_hashes)} files hashed")
     return source_hashes
 
 
-def simulate_phase3_verification(destination: Path, source_hashes: dict[str, str]) -> dict:
-    """Simulate Phase 3: Verify destination files (NEW IMPLEMENTATION)."""
+def open_all(paths: list[str]) -> list[Union[int, OSError]]:
+    """Open files for reading, returning an fd or the OSError for each path."""
+    fds = []
+    for path in paths:
+        try:
+            fds.append(os.open(path, os.O_RDONLY))
+        except OSError as e:
+            fds.append(e)
+    return fds
+
+
+def collect_source_stats(source: Path) -> dict[str, tuple[int, int]]:
+    """Record (size, mtime_ns) of every source file for quick verification."""
+    stats = {}
+    for entry, rel_path in iter_files(source):
+        st = entry.stat()
+        stats[rel_path] = (st.st_size, st.st_mtime_ns)
+    return stats
+
+
+def simulate_phase1_cached(
+    source: Path, excluded_patterns: list[str], cache_path: Path, jobs: Optional[int] = None
+) -> dict[str, str]:
+    """
+    Simulate Phase 1, reusing the hashes saved by an earlier run.
+
+    The cache is keyed on the source path, algorithm, exclude patterns and
+    the (size, mtime_ns) of every source file, so a run that was interrupted
+    after Phase 1 can retry Phase 3 with one stat per file instead of
+    re-reading the whole source. Any change to the source re-hashes it.
+    """
+    key = {
+        "source": os.fspath(source),
+        "algorithm": ALGORITHM,
+        "excludes": list(excluded_patterns),
+        "stats": {rel: list(stat) for rel, stat in collect_source_stats(source).items()},
+    }
+
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached["key"] == key:
+            print(f"Phase 1: Reusing {len(cached['hashes'])} hashes from {cache_path}")
+            return cached["hashes"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    source_hashes = simulate_phase1_hashing(source, excluded_patterns, jobs)
+
+    tmp_path = cache_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"key": key, "hashes": source_hashes}), encoding="utf-8")
+    os.replace(tmp_path, cache_path)
+    return source_hashes
+
+
+def simulate_phase3_verification(
+    destination: Path,
+    source_hashes: dict[str, str],
+    jobs: Optional[int] = None,
+    source_stats: Optional[dict[str, tuple[int, int]]] = None,
+) -> dict:
+    """
+    Simulate Phase 3: Verify destination files (NEW IMPLEMENTATION).
+
+    If source_stats is given (quick verification), files whose size and
+    mtime_ns match the source are counted as verified without being hashed.
+    This skips reading unchanged files entirely but cannot detect corruption
+    that leaves the metadata untouched, so it is opt-in.
+    """
     files_verified = 0
+    files_hashed = 0
     files_failed = 0
     failed_files = []
     files_checked = set()
+    # Files to hash, as parallel lists of relative and absolute path strings
+    rel_paths = []
+    abs_paths = []
+    lines = []
 
     print(f"\nPhase 3: Verifying files in {destination}")
 
-    # Read files sequentially from destination (filesystem order)
-    for path in destination.rglob("*"):
-        if path.is_file():
-            rel_path = str(path.relative_to(destination))
-            files_checked.add(rel_path)
-
-            # Skip files not in our hash dictionary
-            if rel_path not in source_hashes:
-                print(f"  WARNING: File not in source_hashes: {rel_path}")
+    # Collect files in filesystem order with a single scandir walk, then hash
+    # them on a thread pool
+    for entry, rel_path in iter_files(destination):
+        files_checked.add(rel_path)
+
+        # Skip files not in our hash dictionary
+        if rel_path not in source_hashes:
+            lines.append(f"  WARNING: File not in source_hashes: {rel_path}")
+            continue
+
+        if source_stats is not None:
+            st = entry.stat()
+            if source_stats.get(rel_path) == (st.st_size, st.st_mtime_ns):
+                files_verified += 1
+                if VERBOSE:
+                    lines.append(f"  ✓ Unchanged: {rel_path}")
                 continue
 
-            source_hash = source_hashes[rel_path]
+        rel_paths.append(rel_path)
+        abs_paths.append(entry.path)
 
+    with ThreadPoolExecutor(max_workers=jobs or JOBS) as executor:
+        for start in range(0, len(rel_paths), OPEN_BATCH):
+            # Open a batch up front: files that can't be opened are reported
+            # straight away and only readable ones are handed to the pool
+            batch = rel_paths[start:start + OPEN_BATCH]
+            fds = open_all(abs_paths[start:start + OPEN_BATCH])
             try:
-                dest_hash = hash_file(path)
-
-                if source_hash == dest_hash:
-                    files_verified += 1
-                    print(f"  ✓ Verified: {rel_path}")
-                else:
-                    files_failed += 1
-                    failed_files.append(f"{rel_path} (hash mismatch)")
-                    print(f"  ✗ MISMATCH: {rel_path}")
-            except OSError as e:
-                files_failed += 1
-                failed_files.append(f"{rel_path} (read error: {e})")
-                print(f"  ✗ ERROR: {rel_path}: {e}")
-
-    # Check for missing files (in source_hashes but not on destination)
-    dest_files = {
-        str(p.relative_to(destination))
-        for p in destination.rglob("*")
-        if p.is_file()
-    }
-
-    for rel_path in source_hashes.keys():
-        if rel_path not in dest_files:
-            files_failed += 1
-            failed_files.append(f"{rel_path} (missing)")
-            print(f"  ✗ MISSING: {rel_path}")
-
+                futures = {}
+                for rel_path, fd in zip(batch, fds):
+                    if isinstance(fd, OSError):
+                        files_failed += 1
+                        failed_files.append(f"{rel_path} (read error: {fd})")
+                        lines.append(f"  ✗ ERROR: {rel_path}: {fd}")
+                    else:
+                        future = executor.submit(hash_fd_int, fd, ALGORITHM, drop_cache=True)
+                        futures[future] = rel_path
+
+                for future in as_completed(futures):
+                    rel_path = futures[future]
+                    files_hashed += 1
+                    try:
+                        dest_hash = future.result()
+
+                        if parse_hash(source_hashes[rel_path]) == dest_hash:
+                            files_verified += 1
+                            if VERBOSE:
+                                lines.append(f"  ✓ Verified: {rel_path}")
+                        else:
+                            files_failed += 1
+                            failed_files.append(f"{rel_path} (hash mismatch)")
+                            lines.append(f"  ✗ MISMATCH: {rel_path}")
+                    except OSError as e:
+                        files_failed += 1
+                        failed_files.append(f"{rel_path} (read error: {e})")
+                        lines.append(f"  ✗ ERROR: {rel_path}: {e}")
+            finally:
+                for fd in fds:
+                    if isinstance(fd, int):
+                        os.close(fd)
+
+    # Check for missing files (in source_hashes but not seen on destination)
+    for rel_path in sorted(source_hashes.keys() - files_checked):
+        files_failed += 1
+        failed_files.append(f"{rel_path} (missing)")
+        lines.append(f"  ✗ MISSING: {rel_path}")
+
+    write_lines(lines)
     print(f"\nPhase 3 complete:")
     print(f"  Files in source_hashes: {len(source_hashes)}")
-    print(f"  Files found on destination: {len(dest_files)}")
+    print(f"  Files found on destination: {len(files_checked)}")
     print(f"  Files checked: {len(files_checked)}")
+    print(f"  Files hashed: {files_hashed}")
     print(f"  Files verified: {files_verified}")
     print(f"  Files failed: {files_failed}")
 
@@ -129,8 +312,98 @@ def simulate_phase3_verification(destination: Path, source_hashes: dict[str, str
         "failed": files_failed,
         "failed_files": failed_files,
         "files_in_source": len(source_hashes),
-        "files_in_dest": len(dest_files),
+        "files_in_dest": len(files_checked),
         "files_checked": len(files_checked),
+        "files_hashed": files_hashed,
+    }
+
+
+def simulate_parallel_verification(source: Path, destination: Path) -> dict:
+    """
+    Simulate hashing the source and destination concurrently.
+
+    Each tree is walked and hashed sequentially on its own thread, since the
+    two usually sit on independent devices (e.g. SSD and tape); hashing and
+    file reads release the GIL. Files are compared as soon as both sides
+    have reported them, so the total time is roughly the slower of the two
+    trees rather than their sum.
+    """
+    results: queue.Queue = queue.Queue()
+
+    def hash_tree(side: int, root: Path) -> None:
+        try:
+            for entry, rel_path in iter_files(root):
+                try:
+                    file_hash = hash_file(entry.path, algorithm=ALGORITHM, drop_cache=True)
+                except OSError as e:
+                    file_hash = e
+                results.put((side, rel_path, file_hash))
+        finally:
+            results.put((side, None, None))
+
+    print(f"\nHashing {source} and {destination} in parallel")
+    threads = [
+        threading.Thread(target=hash_tree, args=(side, root), daemon=True)
+        for side, root in enumerate((source, destination))
+    ]
+    for thread in threads:
+        thread.start()
+
+    # Hashes reported by one side and still waiting for the other
+    pending: tuple[dict, dict] = ({}, {})
+    files_verified = 0
+    files_failed = 0
+    failed_files = []
+    lines = []
+    running = len(threads)
+
+    while running:
+        side, rel_path, file_hash = results.get()
+        if rel_path is None:
+            running -= 1
+            continue
+
+        other = pending[1 - side]
+        if rel_path not in other:
+            pending[side][rel_path] = file_hash
+            continue
+
+        if side == 0:
+            source_hash, dest_hash = file_hash, other.pop(rel_path)
+        else:
+            source_hash, dest_hash = other.pop(rel_path), file_hash
+        if isinstance(source_hash, OSError) or isinstance(dest_hash, OSError):
+            error = source_hash if isinstance(source_hash, OSError) else dest_hash
+            files_failed += 1
+            failed_files.append(f"{rel_path} (read error: {error})")
+            lines.append(f"  ✗ ERROR: {rel_path}: {error}")
+        elif source_hash == dest_hash:
+            files_verified += 1
+            if VERBOSE:
+                lines.append(f"  ✓ Verified: {rel_path}")
+        else:
+            files_failed += 1
+            failed_files.append(f"{rel_path} (hash mismatch)")
+            lines.append(f"  ✗ MISMATCH: {rel_path}")
+
+    for thread in threads:
+        thread.join()
+
+    # Anything left over was only seen on one side
+    for rel_path in sorted(pending[0]):
+        files_failed += 1
+        failed_files.append(f"{rel_path} (missing)")
+        lines.append(f"  ✗ MISSING: {rel_path}")
+    for rel_path in sorted(pending[1]):
+        lines.append(f"  WARNING: File not in source: {rel_path}")
+
+    write_lines(lines)
+    print(f"Parallel verification complete: {files_verified} verified, {files_failed} failed")
+
+    return {
+        "verified": files_verified,
+        "failed": files_failed,
+        "failed_files": failed_files,
     }
 
 
@@ -267,7 +540,150 @@ def test_corrupted_file():
         print("✓ TEST PASSED: Corrupted file detected correctly")
 
 
+def test_quick_verification():
+    """Test case: quick verification skips unchanged files but hashes modified ones."""
+    print("\n" + "="*80)
+    print("TEST 4: Quick verification (size + mtime)")
+    print("="*80)
+
+    with source_tree(copy=True) as tmp:
+        source = tmp / "source"
+        destination = tmp / "destination"
+
+        # Corrupt one file; writing to it updates its mtime
+        corrupt_file = destination / "subdir1" / "nested" / "testfile_003.bin"
+        with open(corrupt_file, 'r+b') as f:
+            f.seek(1024)
+            f.write(b'\xFF' * 1024)
+        os.utime(corrupt_file, ns=(0, 0))
+        print(f"Corrupted {corrupt_file.relative_to(destination)}")
+
+        # Simulate Phase 1
+        source_hashes = simulate_phase1_hashing(source, [])
+        source_stats = collect_source_stats(source)
+
+        # Simulate Phase 3
+        result = simulate_phase3_verification(destination, source_hashes, source_stats=source_stats)
+
+        # Verify results
+        print("\n--- VERIFICATION ---")
+        assert result["files_checked"] == 10, \
+            f"Expected 10 files checked, got {result['files_checked']}"
+        assert result["files_hashed"] == 1, f"Expected 1 file hashed, got {result['files_hashed']}"
+        assert result["verified"] == 9, f"Expected 9 files verified, got {result['verified']}"
+        assert result["failed"] == 1, f"Expected 1 failure, got {result['failed']}"
+        assert "mismatch" in result["failed_files"][0].lower(), \
+            "Expected 'mismatch' in failure message"
+        print("✓ TEST PASSED: Only the modified file was hashed")
+
+
+def test_excluded_directory():
+    """Test case: excluded directories are pruned from Phase 1."""
+    print("\n" + "="*80)
+    print("TEST 5: Excluded directory pruned from hashing")
+    print("="*80)
+
+    with source_tree() as tmp:
+        source = tmp / "source"
+
+        # Add an excluded directory and file
+        (source / "subdir2" / ".Trashes" / "deep").mkdir(parents=True)
+        (source / "subdir2" / ".Trashes" / "deep" / "junk.bin").write_bytes(b"junk")
+        (source / "subdir1" / "scratch.tmp").write_bytes(b"scratch")
+
+        # Simulate Phase 1
+        source_hashes = simulate_phase1_hashing(source, [".Trashes", "*.tmp"])
+
+        # Verify results
+        print("\n--- VERIFICATION ---")
+        assert len(source_hashes) == 10, f"Expected 10 files hashed, got {len(source_hashes)}"
+        assert not any(".Trashes" in p or p.endswith(".tmp") for p in source_hashes), \
+            "Excluded files were hashed"
+        print("✓ TEST PASSED: Excluded files skipped")
+
+
+def test_phase1_cache():
+    """Test case: Phase 1 hashes are reused until the source changes."""
+    print("\n" + "="*80)
+    print("TEST 6: Phase 1 hash cache")
+    print("="*80)
+
+    with source_tree() as tmp:
+        source = tmp / "source"
+        cache_path = tmp / "source.mhl.cache"
+
+        # First run hashes and writes the cache
+        source_hashes = simulate_phase1_cached(source, [], cache_path)
+        assert cache_path.exists(), "Expected cache file to be written"
+
+        # Tamper with a cached hash: an unchanged source must return it as is
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        cached["hashes"]["testfile_000.bin"] = "cached"
+        cache_path.write_text(json.dumps(cached), encoding="utf-8")
+        reused = simulate_phase1_cached(source, [], cache_path)
+
+        # Modifying a source file invalidates the cache
+        with open(source / "testfile_000.bin", 'r+b') as f:
+            f.write(b'\xFF')
+        os.utime(source / "testfile_000.bin", ns=(0, 0))
+        rehashed = simulate_phase1_cached(source, [], cache_path)
+
+        # Verify results
+        print("\n--- VERIFICATION ---")
+        assert reused["testfile_000.bin"] == "cached", "Expected hashes to be reused from cache"
+        assert rehashed["testfile_000.bin"] not in ("cached", source_hashes["testfile_000.bin"]), \
+            "Expected modified source to be re-hashed"
+        assert len(rehashed) == 10, f"Expected 10 files hashed, got {len(rehashed)}"
+        print("✓ TEST PASSED: Cache reused and invalidated correctly")
+
+
+def test_parallel_verification():
+    """Test case: source and destination hashed concurrently."""
+    print("\n" + "="*80)
+    print("TEST 7: Parallel source/destination hashing")
+    print("="*80)
+
+    with source_tree(copy=True) as tmp:
+        source = tmp / "source"
+        destination = tmp / "destination"
+
+        # Remove one file from destination and corrupt another
+        (destination / "subdir1" / "testfile_005.bin").unlink()
+        with open(destination / "subdir1" / "nested" / "testfile_003.bin", 'r+b') as f:
+            f.seek(1024)
+            f.write(b'\xFF' * 1024)
+
+        result = simulate_parallel_verification(source, destination)
+
+        # Verify results
+        print("\n--- VERIFICATION ---")
+        assert result["verified"] == 8, f"Expected 8 files verified, got {result['verified']}"
+        assert result["failed"] == 2, f"Expected 2 failures, got {result['failed']}"
+        failures = " ".join(result["failed_files"]).lower()
+        assert "mismatch" in failures and "missing" in failures, \
+            f"Expected a mismatch and a missing file, got {result['failed_files']}"
+        print("✓ TEST PASSED: Parallel verification detected both failures")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LTFS transfer verification logic tests")
+    parser.add_argument(
+        "--jobs", type=int, default=JOBS, help=f"files hashed concurrently (default: {JOBS})"
+    )
+    parser.add_argument(
+        "--algorithm",
+        choices=sorted(HASH_ALGORITHMS),
+        default=ALGORITHM,
+        help=f"hash algorithm (default: {ALGORITHM})",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="print every file hashed or verified"
+    )
+    args = parser.parse_args()
+    JOBS = max(1, args.jobs)
+    ALGORITHM = args.algorithm
+    VERBOSE = args.verbose
+
     print("\n" + "="*80)
     print("LTFS Transfer Verification Logic Test Suite")
     print("="*80)
@@ -276,6 +692,10 @@ if __name__ == "__main__":
         test_normal_case()
         test_missing_file()
         test_corrupted_file()
+        test_quick_verification()
+        test_excluded_directory()
+        test_phase1_cache()
+        test_parallel_verification()
 
         print("\n" + "="*80)
         print("ALL TESTS PASSED ✓")